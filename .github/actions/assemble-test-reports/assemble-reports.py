@@ -16,9 +16,11 @@ Output (GITHUB_OUTPUT format on stdout):
 """
 
 import argparse
+import os
 import re
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -27,7 +29,7 @@ def _parse_newline_list(value: str) -> list[str]:
     """Parse a newline-separated string into a list, stripping blanks."""
     if not value:
         return []
-    return [line.strip() for line in value.strip().splitlines() if line.strip()]
+    return [s for s in (line.strip() for line in value.splitlines()) if s]
 
 
 def _sanitize_name(name: str) -> str:
@@ -52,38 +54,99 @@ def _make_timestamped_name(report_name: str) -> str:
     enough resolution to avoid collisions in practice.
     """
     now = datetime.now(timezone.utc)
-    ts = now.strftime("%Y-%m-%d-%H%M")
-    secs = f"{now.second:02d}{now.microsecond // 100000:01d}0"
-    return f"{report_name}-{ts}-{secs}"
+    return (
+        f"{report_name}-{now.year:04d}-{now.month:02d}-{now.day:02d}-{now.hour:02d}{now.minute:02d}"
+        f"-{now.second:02d}{now.microsecond // 100000:01d}0"
+    )
 
 
-def _validate_path_safe(path: Path, label: str) -> bool:
+def _validate_path_safe(path: str, label: str) -> bool:
     """Validate that a path does not contain traversal components.
 
     Rejects paths containing '..' to prevent directory traversal attacks.
     Returns True if valid, False otherwise (with warning printed).
     """
     # Check for path traversal attempts via '..' components
-    if ".." in path.parts:
+    if os.altsep:
+        path_parts = path.replace(os.altsep, os.sep).split(os.sep)
+    else:
+        path_parts = path.split(os.sep)
+    if ".." in path_parts:
         print(f"::warning::{label} contains path traversal (..), skipping: {path}", file=sys.stderr)
         return False
     return True
 
 
-def _unique_leaf(dest_parent: Path, leaf: str) -> Path:
-    """Return a unique path under dest_parent for the given leaf name.
+def _unique_leaf(dest_parent: str, leaf: str, taken: set[str]) -> str:
+    """Return a unique leaf name under dest_parent for the given leaf name.
 
-    If dest_parent/leaf already exists, appends -2, -3, etc.
+    If dest_parent/leaf already exists, appends -2, -3, etc. Leaves handed
+    out earlier in the same run are tracked in `taken`, so collision chains
+    are resolved in memory and only a never-seen candidate costs a lstat().
+    The chosen leaf is added to `taken`.
     """
-    candidate = dest_parent / leaf
-    if not candidate.exists():
-        return candidate
+    candidate = leaf
     counter = 2
-    while True:
-        candidate = dest_parent / f"{leaf}-{counter}"
-        if not candidate.exists():
-            return candidate
+    while candidate in taken or os.path.lexists(os.path.join(dest_parent, candidate)):
+        taken.add(candidate)
+        candidate = f"{leaf}-{counter}"
         counter += 1
+    taken.add(candidate)
+    return candidate
+
+
+def _copy_file(src: str, dst: str) -> None:
+    """Copy a single file's content and metadata.
+
+    Uses os.copy_file_range() where the platform provides it, so the data is
+    copied in-kernel without passing through user space. Falls back to
+    shutil.copyfile() (which itself uses sendfile/fcopyfile where possible)
+    if the in-kernel copy is unavailable or fails, e.g. across filesystems
+    on older kernels.
+    """
+    copied = False
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    written = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if written == 0:
+                        break
+                    remaining -= written
+            copied = remaining == 0
+        except OSError:
+            copied = False
+    if not copied:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+def _fast_copytree(src: str, dst: str, workers: int = 8) -> None:
+    """Copy a directory tree, copying the files in parallel.
+
+    Equivalent to shutil.copytree(src, dst) for regular trees: symlinks are
+    followed and file metadata is preserved. The directory skeleton is created
+    first, then the files are copied by a thread pool since the work is
+    I/O-bound. The first copy error is re-raised.
+    """
+    dirs: list[tuple[str, str]] = []
+    files: list[tuple[str, str]] = []
+    for root, _dirnames, filenames in os.walk(src, followlinks=True):
+        dest_root = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(dest_root, exist_ok=True)
+        dirs.append((root, dest_root))
+        for filename in filenames:
+            files.append((os.path.join(root, filename), os.path.join(dest_root, filename)))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_copy_file, s, d) for s, d in files]
+        for future in futures:
+            future.result()
+
+    # Directory metadata last, as copying files into them updates their mtime
+    for src_dir, dest_dir in reversed(dirs):
+        shutil.copystat(src_dir, dest_dir)
 
 
 def assemble_reports(
@@ -107,23 +170,24 @@ def assemble_reports(
         SystemExit: If no report directories are found at all
     """
     dirname = _make_timestamped_name(report_name)
-    report_path = output_dir / dirname
-    report_path.mkdir(parents=True, exist_ok=True)
+    report_path = os.path.join(output_dir, dirname)
+    os.makedirs(report_path, exist_ok=True)
 
-    # Copy report directories
+    # Copy report directories. Paths stay plain strings handled with os.path;
+    # a Path is only built for the return value.
     found_any = False
+    taken_reports: set[str] = set()
     for folder_str in reports_folder:
-        folder = Path(folder_str)
-        if not _validate_path_safe(folder, "Reports folder"):
+        if not _validate_path_safe(folder_str, "Reports folder"):
             continue
-        if not folder.is_dir():
-            print(f"::warning::Reports folder not found, skipping: {folder}", file=sys.stderr)
+        if not os.path.isdir(folder_str):
+            print(f"::warning::Reports folder not found, skipping: {folder_str}", file=sys.stderr)
             continue
-        leaf = folder.name
-        dest = _unique_leaf(report_path, leaf)
-        shutil.copytree(folder, dest)
+        leaf = os.path.basename(os.path.normpath(folder_str))
+        dest_leaf = _unique_leaf(report_path, leaf, taken_reports)
+        _fast_copytree(folder_str, os.path.join(report_path, dest_leaf))
         found_any = True
-        print(f"  Copied {folder} -> {dest.name}", file=sys.stderr)
+        print(f"  Copied {folder_str} -> {dest_leaf}", file=sys.stderr)
 
     if not found_any:
         print("::error::No report directories found — nothing to assemble", file=sys.stderr)
@@ -131,20 +195,20 @@ def assemble_reports(
 
     # Copy log files
     if report_logs:
-        logs_dir = report_path / "logs"
-        logs_dir.mkdir(exist_ok=True)
+        logs_dir = os.path.join(report_path, "logs")
+        os.makedirs(logs_dir, exist_ok=True)
+        taken_logs: set[str] = set()
         for log_str in report_logs:
-            log_file = Path(log_str)
-            if not _validate_path_safe(log_file, "Log file"):
+            if not _validate_path_safe(log_str, "Log file"):
                 continue
-            if not log_file.is_file():
-                print(f"::warning::Log file not found, skipping: {log_file}", file=sys.stderr)
+            if not os.path.isfile(log_str):
+                print(f"::warning::Log file not found, skipping: {log_str}", file=sys.stderr)
                 continue
-            dest = _unique_leaf(logs_dir, log_file.name)
-            shutil.copy2(log_file, dest)
-            print(f"  Copied log {log_file} -> logs/{dest.name}", file=sys.stderr)
+            dest_leaf = _unique_leaf(logs_dir, os.path.basename(log_str), taken_logs)
+            _copy_file(log_str, os.path.join(logs_dir, dest_leaf))
+            print(f"  Copied log {log_str} -> logs/{dest_leaf}", file=sys.stderr)
 
-    return report_path, dirname
+    return Path(report_path), dirname
 
 
 def main() -> int:
@@ -198,9 +262,8 @@ def main() -> int:
 
     print("::endgroup::", file=sys.stderr)
 
-    # Output in GITHUB_OUTPUT format (stdout)
-    print(f"report-dir={report_path}")
-    print(f"report-dirname={dirname}")
+    # Output in GITHUB_OUTPUT format (stdout) as a single write
+    sys.stdout.write(f"report-dir={report_path}\nreport-dirname={dirname}\n")
 
     return 0
 
@@ -13,16 +13,17 @@ Timestamped directory pattern: <name>-YYYY-MM-DD-HHmm-SSSS
 
 import argparse
 import html
-import re
+import os
 import sys
+from collections.abc import Iterator
 from datetime import datetime, timezone
 from pathlib import Path
 
-# Matches: <report-name>-<YYYY>-<MM>-<DD>-<HHmm>-<SSSS>
-# The report name is a greedy prefix that can contain hyphens.
-TIMESTAMP_PATTERN = re.compile(
-    r"^(.+)-(\d{4})-(\d{2})-(\d{2})-(\d{4})-(\d{4})$"
-)
+# Directories are named <report-name>-<YYYY>-<MM>-<DD>-<HHmm>-<SSSS>; the report
+# name can contain hyphens. Length of the fixed-width timestamp suffix and its
+# hyphen offsets:
+_TS_LEN = 20
+_TS_HYPHENS = (4, 7, 10, 15)
 
 
 def parse_timestamped_dir(dirname: str) -> tuple[str, str] | None:
@@ -30,13 +31,19 @@ def parse_timestamped_dir(dirname: str) -> tuple[str, str] | None:
 
     Returns None if the directory name doesn't match the expected pattern.
     The timestamp_key is sortable (YYYY-MM-DD-HHmm-SSSS).
+
+    The timestamp suffix is fixed-width, so it is checked by slicing instead
+    of a backtracking regex.
     """
-    match = TIMESTAMP_PATTERN.match(dirname)
-    if not match:
+    if len(dirname) <= _TS_LEN + 1 or dirname[-_TS_LEN - 1] != "-":
+        return None
+    ts_key = dirname[-_TS_LEN:]
+    if any(ts_key[i] != "-" for i in _TS_HYPHENS):
         return None
-    name = match.group(1)
-    ts_key = f"{match.group(2)}-{match.group(3)}-{match.group(4)}-{match.group(5)}-{match.group(6)}"
-    return name, ts_key
+    digits = ts_key.replace("-", "")
+    if len(digits) != _TS_LEN - len(_TS_HYPHENS) or not digits.isdecimal():
+        return None
+    return dirname[: -_TS_LEN - 1], ts_key
 
 
 def format_timestamp(ts_key: str) -> str:
@@ -60,11 +67,18 @@ def scan_reports(target_dir: Path) -> dict[str, list[tuple[str, str, str]]]:
 
     Returns a dict mapping report_name -> list of (timestamp_key, dirname, display_ts),
     sorted newest-first within each group.
+
+    Uses a single os.scandir() pass so the directory check comes from the
+    cached entry type instead of a stat() per entry. Symlinked directories
+    are not followed.
     """
     groups: dict[str, list[tuple[str, str, str]]] = {}
 
-    for entry in sorted(target_dir.iterdir()):
-        if not entry.is_dir():
+    with os.scandir(target_dir) as it:
+        entries = sorted(it, key=lambda e: e.name)
+
+    for entry in entries:
+        if not entry.is_dir(follow_symlinks=False):
             continue
         parsed = parse_timestamped_dir(entry.name)
         if parsed is None:
@@ -80,81 +94,102 @@ def scan_reports(target_dir: Path) -> dict[str, list[tuple[str, str, str]]]:
     return groups
 
 
-def generate_html(title: str, groups: dict[str, list[tuple[str, str, str]]]) -> str:
-    """Generate the overview index.html content.
-
-    Args:
-        title: Page title (HTML-escaped internally)
-        groups: Report groups from scan_reports()
-
-    Returns:
-        Complete HTML5 document as string
-    """
-    safe_title = html.escape(title)
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-
-    sections = []
-    for name in sorted(groups.keys()):
-        entries = groups[name]
-        safe_name = html.escape(name)
-        items = []
-        for _ts_key, dirname, display_ts in entries:
-            safe_dirname = html.escape(dirname)
-            safe_display = html.escape(display_ts)
-            items.append(
-                f'      <li><a href="./{safe_dirname}/index.html">{safe_dirname}</a>'
-                f" <span class=\"ts\">{safe_display}</span></li>"
-            )
-        items_html = "\n".join(items)
-        sections.append(
-            f"    <h2>{safe_name}</h2>\n"
-            f"    <ul>\n{items_html}\n    </ul>"
-        )
-
-    sections_html = "\n".join(sections) if sections else "    <p>No reports found.</p>"
-
-    return f"""<!DOCTYPE html>
+_HTML_HEAD = b"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="utf-8">
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <title>{safe_title} - Test Reports</title>
+  <title>"""
+
+_HTML_STYLE = b""" - Test Reports</title>
   <style>
-    body {{
+    body {
       font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
       max-width: 900px;
       margin: 2rem auto;
       padding: 0 1rem;
       color: #e0e0e0;
       background: #1a1a2e;
-    }}
-    h1 {{ color: #00d4ff; border-bottom: 2px solid #16213e; padding-bottom: 0.5rem; }}
-    h2 {{ color: #a0c4ff; margin-top: 2rem; }}
-    ul {{ list-style: none; padding: 0; }}
-    li {{ padding: 0.4rem 0; }}
-    a {{ color: #64b5f6; text-decoration: none; }}
-    a:hover {{ text-decoration: underline; }}
-    .ts {{ color: #888; font-size: 0.85em; margin-left: 0.5em; }}
-    footer {{ margin-top: 3rem; color: #555; font-size: 0.8em; border-top: 1px solid #16213e; padding-top: 0.5rem; }}
-    @media (prefers-color-scheme: light) {{
-      body {{ color: #333; background: #fff; }}
-      h1 {{ color: #0066cc; border-bottom-color: #ddd; }}
-      h2 {{ color: #0055aa; }}
-      a {{ color: #0066cc; }}
-      .ts {{ color: #999; }}
-      footer {{ color: #aaa; border-top-color: #ddd; }}
-    }}
+    }
+    h1 { color: #00d4ff; border-bottom: 2px solid #16213e; padding-bottom: 0.5rem; }
+    h2 { color: #a0c4ff; margin-top: 2rem; }
+    ul { list-style: none; padding: 0; }
+    li { padding: 0.4rem 0; }
+    a { color: #64b5f6; text-decoration: none; }
+    a:hover { text-decoration: underline; }
+    .ts { color: #888; font-size: 0.85em; margin-left: 0.5em; }
+    footer { margin-top: 3rem; color: #555; font-size: 0.8em; border-top: 1px solid #16213e; padding-top: 0.5rem; }
+    @media (prefers-color-scheme: light) {
+      body { color: #333; background: #fff; }
+      h1 { color: #0066cc; border-bottom-color: #ddd; }
+      h2 { color: #0055aa; }
+      a { color: #0066cc; }
+      .ts { color: #999; }
+      footer { color: #aaa; border-top-color: #ddd; }
+    }
   </style>
 </head>
 <body>
-  <h1>{safe_title} - Test Reports</h1>
-{sections_html}
-  <footer>Generated {html.escape(now)}</footer>
+  <h1>"""
+
+_HTML_EMPTY_BODY = b""" - Test Reports</h1>
+    <p>No reports found.</p>
+  <footer>Generated """
+
+_HTML_FOOT = b"""</footer>
 </body>
 </html>
 """
 
 
+def iter_html(title: str, groups: dict[str, list[tuple[str, str, str]]]) -> Iterator[bytes]:
+    """Generate the overview index.html content as UTF-8 encoded chunks.
+
+    The static head, style and footer are module-level bytes constants; each
+    report group is rendered and encoded as one chunk, so the whole document
+    is never held in memory as both str and bytes.
+
+    Args:
+        title: Page title (HTML-escaped internally)
+        groups: Report groups from scan_reports()
+
+    Yields:
+        Consecutive chunks of the complete HTML5 document
+    """
+    _esc = html.escape
+    safe_title = _esc(title).encode("utf-8")
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+    yield _HTML_HEAD
+    yield safe_title
+    yield _HTML_STYLE
+    yield safe_title
+    if not groups:
+        yield _HTML_EMPTY_BODY
+        yield _esc(now).encode("utf-8")
+        yield _HTML_FOOT
+        return
+
+    yield b" - Test Reports</h1>\n"
+    for name in sorted(groups):
+        parts = ["    <h2>", _esc(name), "</h2>\n    <ul>\n"]
+        append = parts.append
+        for _ts_key, dirname, display_ts in groups[name]:
+            safe_dirname = _esc(dirname)
+            append('      <li><a href="./')
+            append(safe_dirname)
+            append('/index.html">')
+            append(safe_dirname)
+            append('</a> <span class="ts">')
+            append(_esc(display_ts))
+            append("</span></li>\n")
+        append("    </ul>\n")
+        yield "".join(parts).encode("utf-8")
+    yield b"  <footer>Generated "
+    yield _esc(now).encode("utf-8")
+    yield _HTML_FOOT
+
+
 def main() -> int:
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -183,9 +218,9 @@ def main() -> int:
     total = sum(len(v) for v in groups.values())
     print(f"Found {total} report(s) in {len(groups)} group(s)", file=sys.stderr)
 
-    html_content = generate_html(args.title, groups)
     index_path = target_dir / "index.html"
-    index_path.write_text(html_content, encoding="utf-8")
+    with open(index_path, "wb") as f:
+        f.writelines(iter_html(args.title, groups))
     print(f"Wrote {index_path}", file=sys.stderr)
 
     return 0
@@ -12,6 +12,7 @@ Output:
 """
 
 import argparse
+import re
 import sys
 from collections.abc import Callable
 from pathlib import Path
@@ -24,10 +25,23 @@ except ImportError:
     print("Error: PyYAML not installed. Run: pip install pyyaml", file=sys.stderr)
     sys.exit(1)
 
+# Prefer the libyaml-backed loader; fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
 
 # Type alias for transform functions
 TransformFn = Callable[[Any], Any] | None
 
+# Allowlist matchers for the sanitizers, compiled once at import
+_SAFE_SHELL = re.compile(r"^[a-zA-Z0-9_./:,\-]+$").match
+_SAFE_GLOB = re.compile(r"^[a-zA-Z0-9_./*?\-\[\]{},]+$").match
+_SAFE_SHELL_ARG = re.compile(r"^[a-zA-Z0-9_./:,=\-]+$").match
+_WHITESPACE_RUN = re.compile(r"\s+")
+
+
 def _sanitize_shell_value(value: Any) -> str:
     """Sanitize a string value that may be used in shell commands.
 
@@ -35,12 +49,10 @@ def _sanitize_shell_value(value: Any) -> str:
     profiles, and path segments. Rejects any value containing shell
     metacharacters to prevent command injection via GITHUB_OUTPUT.
     """
-    import re
     s = str(value).strip() if value is not None else ""
     if not s:
         return ""
-    safe_pattern = re.compile(r"^[a-zA-Z0-9_./:,\-]+$")
-    if safe_pattern.match(s):
+    if _SAFE_SHELL(s):
         return s
     return ""
 
@@ -54,12 +66,11 @@ def _sanitize_glob_list(value: Any) -> str:
     """
     if not isinstance(value, list):
         return ""
-    import re
-    safe_pattern = re.compile(r"^[a-zA-Z0-9_./*?\-\[\]{},]+$")
+    safe_glob = _SAFE_GLOB
     parts = []
     for item in value:
         s = str(item).strip()
-        if s and safe_pattern.match(s):
+        if s and safe_glob(s):
             parts.append(s)
     return " ".join(parts)
 
@@ -77,9 +88,8 @@ def _sanitize_token_list(value: Any) -> str:
     error, which is more useful than silently dropping a mistyped goal and
     building something the caller did not ask for.
     """
-    import re
     s = str(value).strip() if value is not None else ""
-    return re.sub(r"\s+", " ", s)
+    return _WHITESPACE_RUN.sub(" ", s)
 
 
 def _sanitize_shell_args(value: Any) -> str:
@@ -91,13 +101,11 @@ def _sanitize_shell_args(value: Any) -> str:
     rewrite intent). Mirrors _sanitize_shell_value, but permits spaces and '='
     so multiple flag-style arguments remain expressible.
     """
-    import re
     s = str(value).strip() if value is not None else ""
     if not s:
         return ""
     tokens = s.split()
-    safe_pattern = re.compile(r"^[a-zA-Z0-9_./:,=\-]+$")
-    if not all(safe_pattern.match(t) for t in tokens):
+    if not all(_SAFE_SHELL_ARG(t) for t in tokens):
         return ""
     return " ".join(tokens)
 
@@ -194,27 +202,20 @@ def extract_custom_outputs(data: dict) -> dict[str, str]:
     return outputs
 
 
-def get_nested(data: dict, *keys) -> Any:
-    """Safely get nested dictionary value, returning None if not found."""
-    current: Any = data
-    for key in keys:
-        if not isinstance(current, dict):
-            return None
-        current = current.get(key)
-        if current is None:
-            return None
-    return current
+# Output conversion keyed by exact type; anything else (int, float, date, ...) goes through str()
+_TO_OUTPUT: dict[type, Callable[[Any], str]] = {
+    type(None): lambda value: "",
+    bool: lambda value: "true" if value else "false",
+    list: lambda value: "",
+}
 
 
 def to_output_value(value: Any) -> str:
     """Convert a value to string suitable for GITHUB_OUTPUT."""
-    if value is None:
-        return ""
-    if isinstance(value, bool):
-        return "true" if value else "false"
-    if isinstance(value, list):
-        return ""
-    return str(value)
+    # Most YAML values are already strings; return those without a dispatch call
+    if value.__class__ is str:
+        return value
+    return _TO_OUTPUT.get(type(value), str)(value)
 
 
 def read_config(config_path: Path) -> tuple[dict, bool]:
@@ -226,8 +227,7 @@ def read_config(config_path: Path) -> tuple[dict, bool]:
     if not config_path.exists():
         return {}, False
 
-    with open(config_path, encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    data = yaml.load(config_path.read_bytes(), Loader=_YamlLoader)
 
     if isinstance(data, dict):
         return data, True
@@ -235,29 +235,83 @@ def read_config(config_path: Path) -> tuple[dict, bool]:
 
 
 def extract_outputs(data: dict) -> dict[str, str]:
-    """Extract all output values from config data using the field registry."""
+    """Extract all output values from config data using the field registry.
+
+    Fields are visited grouped by their top-level section, so each section is
+    looked up in data once rather than once per field.
+    """
     outputs = {}
 
-    for yaml_path, output_name, default, transform in FIELD_REGISTRY:
-        # Get value from config
-        value = get_nested(data, *yaml_path)
+    for section_key, fields in _FIELD_SECTIONS:
+        section = data.get(section_key)
+        for rest, output_name, default_output, transform in fields:
+            # Get value from config
+            value = section
+            for key in rest:
+                value = value.get(key) if isinstance(value, dict) else None
 
-        # Apply default if value is None
-        # For boolean fields, we need to check explicitly for None
-        # because False is a valid value
-        if value is None:
-            value = default
+            # Use the pre-rendered default if value is None
+            # For boolean fields, we need to check explicitly for None
+            # because False is a valid value
+            if value is None:
+                outputs[output_name] = default_output
+                continue
 
-        # Apply transform function if provided
-        if transform is not None:
-            value = transform(value)
+            # Apply transform function if provided
+            if transform is not None:
+                value = transform(value)
 
-        # Convert to output string
-        outputs[output_name] = to_output_value(value)
+            # Convert to output string
+            outputs[output_name] = to_output_value(value)
 
     return outputs
 
 
+def _render_default(default: Any, transform: TransformFn) -> str:
+    """Render a registry default to its final output string."""
+    if transform is not None:
+        default = transform(default)
+    return to_output_value(default)
+
+
+def _group_registry() -> list[tuple[str, list[tuple[tuple[str, ...], str, str, TransformFn]]]]:
+    """Group FIELD_REGISTRY by top-level section, preserving registry order.
+
+    Each field becomes (remaining_path, output_name, default_output, transform),
+    with the default already rendered so absent fields skip the transform and
+    conversion entirely.
+    """
+    grouped: dict[str, list[tuple[tuple[str, ...], str, str, TransformFn]]] = {}
+    for yaml_path, output_name, default, transform in FIELD_REGISTRY:
+        grouped.setdefault(yaml_path[0], []).append(
+            (tuple(yaml_path[1:]), output_name, _render_default(default, transform), transform)
+        )
+    return list(grouped.items())
+
+
+# FIELD_REGISTRY specialized once at import
+_FIELD_SECTIONS = _group_registry()
+
+
+# Output keys shown per section in the configuration summary, in display order
+_SUMMARY_SECTIONS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("Maven Build", ("java-versions", "java-version", "enable-snapshot-deploy",
+                     "maven-profiles-snapshot", "maven-profiles-release", "npm-cache",
+                     "skip-on-docs-only", "paths-ignore-extra",
+                     "snapshot-deploy-timeout")),
+    ("npm Build", ("npm-node-version", "npm-registry-url")),
+    ("Sonar", ("sonar-enabled", "sonar-skip-on-dependabot", "sonar-project-key")),
+    ("Release", ("current-version", "next-version", "create-github-release")),
+    ("Pages", ("pages-reference", "deploy-site")),
+    ("Pyprojectx", ("pyprojectx-python-version", "pyprojectx-cache-dependency-glob",
+                    "pyprojectx-upload-artifacts-on-failure", "pyprojectx-verify-goals",
+                    "pyprojectx-verify-args")),
+    ("GitHub Automation", ("auto-merge-build-versions",)),
+    ("Dependency Propagation", ("dep-prop-group-id", "dep-prop-artifact-id", "dep-prop-scope")),
+    ("Other", ("consumers",)),
+)
+
+
 def print_config_summary(outputs: dict[str, str], config_found: bool, config_path: Path) -> None:
     """Print configuration summary to stderr for workflow logs.
 
@@ -274,30 +328,12 @@ def print_config_summary(outputs: dict[str, str], config_found: bool, config_pat
 
     print("", file=sys.stderr)
 
-    # Group outputs by section
-    sections = {
-        "Maven Build": ["java-versions", "java-version", "enable-snapshot-deploy",
-                       "maven-profiles-snapshot", "maven-profiles-release", "npm-cache",
-                       "skip-on-docs-only", "paths-ignore-extra",
-                       "snapshot-deploy-timeout"],
-        "npm Build": ["npm-node-version", "npm-registry-url"],
-        "Sonar": ["sonar-enabled", "sonar-skip-on-dependabot", "sonar-project-key"],
-        "Release": ["current-version", "next-version", "create-github-release"],
-        "Pages": ["pages-reference", "deploy-site"],
-        "Pyprojectx": ["pyprojectx-python-version", "pyprojectx-cache-dependency-glob",
-                       "pyprojectx-upload-artifacts-on-failure", "pyprojectx-verify-goals",
-                       "pyprojectx-verify-args"],
-        "GitHub Automation": ["auto-merge-build-versions"],
-        "Dependency Propagation": ["dep-prop-group-id", "dep-prop-artifact-id", "dep-prop-scope"],
-        "Other": ["consumers"],
-    }
-
-    for section_name, keys in sections.items():
-        section_outputs = {k: v for k, v in outputs.items() if k in keys and v}
-        if section_outputs:
-            print(f"  [{section_name}]", file=sys.stderr)
-            for key, value in section_outputs.items():
-                print(f"    {key}: {value}", file=sys.stderr)
+    # Print non-empty outputs grouped by section
+    for section_name, keys in _SUMMARY_SECTIONS:
+        lines = [f"    {key}: {outputs[key]}\n" for key in keys if outputs.get(key)]
+        if lines:
+            sys.stderr.write(f"  [{section_name}]\n")
+            sys.stderr.writelines(lines)
 
     # Print custom fields if any
     custom_keys = outputs.get("custom-keys", "")
@@ -333,12 +369,12 @@ def main() -> int:
     # Print summary to stderr (visible in workflow logs)
     print_config_summary(outputs, config_found, config_path)
 
-    # Output in GITHUB_OUTPUT format (to stdout)
-    for key, value in outputs.items():
-        print(f"{key}={value}")
-
-    # Output config-found status
-    print(f"config-found={'true' if config_found else 'false'}")
+    # Output in GITHUB_OUTPUT format (to stdout), including config-found status,
+    # as a single write
+    sys.stdout.write(
+        "".join(f"{key}={value}\n" for key, value in outputs.items())
+        + f"config-found={'true' if config_found else 'false'}\n"
+    )
 
     return 0
 
@@ -1,19 +1,48 @@
 #!/usr/bin/env python3
 """Setup branch protection rulesets across cuioss repositories.
 
-Requires: gh cli (https://cli.github.com/)
+Requires: gh cli (https://cli.github.com/), used for the auth check and token.
+API calls go directly to api.github.com over a keep-alive HTTPS connection
+per thread; GH_TOKEN or GITHUB_TOKEN, when set, is used instead of
+`gh auth token`.
+
+GET responses are revalidated with ETags: bodies and their ETags persist in
+$XDG_CACHE_HOME/cuioss/branch-protection-etags.json, and later runs send
+If-None-Match so unchanged resources come back as 304 Not Modified (which
+does not count against the primary rate limit). Entries older than 24 hours
+are dropped on load. Delete the file to start cold. The bypass actor's App ID
+is kept in the same file.
+
+Set GH_DEPS_OK=1 to skip the gh installation/auth check (e.g. in CI jobs
+that already ran it).
 
 Usage:
     ./setup-branch-protection.py                              # Process all repos in config.json
     ./setup-branch-protection.py --repo cui-java-tools --diff # Show diff for single repo
+    ./setup-branch-protection.py --diff-all                   # Show diff for all repos in config
     ./setup-branch-protection.py --repo cui-java-tools --apply # Apply ruleset to single repo
 """
 
 import argparse
+import atexit
+import hashlib
 import json
+import os
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import cache
 from pathlib import Path
+from typing import Any
+
+# The REST client is shared with the scripts in repo-settings/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "repo-settings"))
+
+import github_api
+from github_api import ApiResponse, send
 
 # ANSI colors
 GREEN = "\033[0;32m"
@@ -27,32 +56,151 @@ NC = "\033[0m"
 # --enable/--disable-merge-queue remove any leftover legacy ruleset.
 LEGACY_MERGE_QUEUE_NAME = "plan-marshall-merge-queue"
 
+# Batch mode applies rulesets to this many repositories at once. Kept small:
+# GitHub starts throttling secondary rate limits on bursts of concurrent writes.
+BATCH_WORKERS = 3
+
+# Concurrent job-list requests issued by --list-checks.
+JOB_FETCH_WORKERS = 5
+
+# Concurrent repositories compared by --diff-all (read-only, so a bit wider).
+DIFF_WORKERS = 5
+
+# Batch checkpoint, written next to the config file
+STATE_FILENAME = "state.json"
+
+# Repositories per GraphQL ruleset prefetch, well inside query complexity limits.
+GRAPHQL_BATCH_SIZE = 50
+
+# Per-thread log capture for batch workers, so each repository's lines are
+# printed as one block instead of interleaving with other workers.
+_log_capture = threading.local()
+
+
+def _emit(line: str) -> None:
+    captured = getattr(_log_capture, "lines", None)
+    if captured is not None:
+        captured.append(line)
+    else:
+        print(line, file=sys.stderr)
+
 
 def log_info(msg: str) -> None:
-    print(f"{GREEN}[INFO]{NC} {msg}", file=sys.stderr)
+    _emit(f"{GREEN}[INFO]{NC} {msg}")
 
 
 def log_warn(msg: str) -> None:
-    print(f"{YELLOW}[WARN]{NC} {msg}", file=sys.stderr)
+    _emit(f"{YELLOW}[WARN]{NC} {msg}")
 
 
 def log_error(msg: str) -> None:
-    print(f"{RED}[ERROR]{NC} {msg}", file=sys.stderr)
+    _emit(f"{RED}[ERROR]{NC} {msg}")
+
 
+github_api.warn = log_warn
 
-def run_gh(args: list[str], check: bool = True, input_data: str | None = None) -> subprocess.CompletedProcess:
-    """Run gh command and return result."""
-    return subprocess.run(
-        ["gh"] + args,
-        capture_output=True,
-        text=True,
-        check=check,
-        input=input_data,
+
+def run_captured(func, *args) -> tuple[Any, list[str]]:
+    """Call func(*args), returning its result and the log lines it emitted."""
+    _log_capture.lines = []
+    try:
+        return func(*args), _log_capture.lines
+    finally:
+        _log_capture.lines = None
+
+
+# Successful GET response bodies, keyed by API path. Rulesets are read
+# several times per repository (diff, apply, verify); writes drop the
+# entries of the repository they touch.
+_GH_GET_CACHE: dict[str, str] = {}
+# Worker threads read, fill and invalidate the cache concurrently
+_GH_GET_CACHE_LOCK = threading.Lock()
+
+# Persisted cache: API path -> {"etag", "body", "fetched_at"}, plus
+# "app-id:{org}/{app}" -> {"app_id", "fetched_at"} for bypass actor lookups
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "cuioss"
+ETAG_CACHE_PATH = CACHE_DIR / "branch-protection-etags.json"
+ETAG_CACHE_TTL = 24 * 60 * 60
+_etag_cache: dict[str, dict] = {}
+
+
+def _repo_prefix(path: str) -> str:
+    """Reduce an API path to its `repos/{org}/{repo}/` prefix (or itself)."""
+    parts = path.split("/")
+    return "/".join(parts[:3]) + "/" if parts[0] == "repos" and len(parts) > 3 else path
+
+
+def load_etag_cache() -> None:
+    """Load unexpired entries of the persisted ETag cache."""
+    try:
+        with open(ETAG_CACHE_PATH) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return
+    if not isinstance(entries, dict):
+        return
+    cutoff = time.time() - ETAG_CACHE_TTL
+    _etag_cache.update(
+        (path, entry) for path, entry in entries.items()
+        if isinstance(entry, dict) and entry.get("fetched_at", 0) >= cutoff
     )
 
 
+def save_etag_cache() -> None:
+    """Write the ETag cache atomically; failures only cost future 304s."""
+    tmp_path = ETAG_CACHE_PATH.with_suffix(".tmp")
+    try:
+        ETAG_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(_etag_cache, f)
+        os.replace(tmp_path, ETAG_CACHE_PATH)
+    except OSError as e:
+        log_warn(f"Could not write {ETAG_CACHE_PATH}: {e}")
+
+
+def gh_get(path: str) -> ApiResponse:
+    """GET an API path, served from _GH_GET_CACHE when possible.
+
+    Otherwise the request is conditional on the persisted ETag, and a 304
+    is answered with the stored body.
+    """
+    with _GH_GET_CACHE_LOCK:
+        cached = _GH_GET_CACHE.get(path)
+    if cached is not None:
+        return ApiResponse(200, cached)
+
+    entry = _etag_cache.get(path)
+    result = send("GET", path, None, {"If-None-Match": entry["etag"]} if entry else None)
+    if result.status == 304 and entry:
+        result = ApiResponse(200, entry["body"], entry["etag"])
+    elif result.ok and result.etag:
+        _etag_cache[path] = {"etag": result.etag, "body": result.body, "fetched_at": time.time()}
+
+    if result.ok:
+        with _GH_GET_CACHE_LOCK:
+            _GH_GET_CACHE[path] = result.body
+    return result
+
+
+def gh_request(method: str, path: str, body: dict | None = None) -> ApiResponse:
+    """Send a write request; drops cached GETs of the same repository."""
+    result = send(method, path, None if body is None else json.dumps(body).encode())
+    prefix = _repo_prefix(path)
+    with _GH_GET_CACHE_LOCK:
+        for cached in [p for p in list(_GH_GET_CACHE) if p.startswith(prefix)]:
+            del _GH_GET_CACHE[cached]
+    return result
+
+
 def check_dependencies() -> None:
-    """Check that required dependencies are available."""
+    """Check that required dependencies are available.
+
+    Skipped when GH_DEPS_OK=1, for callers (e.g. CI matrices invoking the
+    script per repository) that have already verified gh once.
+    """
+    if os.environ.get("GH_DEPS_OK") == "1":
+        return
+
     # Check gh cli
     try:
         subprocess.run(["gh", "--version"], capture_output=True, check=True)
@@ -73,19 +221,27 @@ def load_config(config_path: Path) -> dict:
         return json.load(f)
 
 
+@cache
 def get_app_id(org: str, bypass_actor_name: str) -> str | None:
-    """Get GitHub App ID by name."""
-    result = run_gh(
-        [
-            "api", f"orgs/{org}/installations",
-            "--jq", f'.installations[] | select(.app_slug == "{bypass_actor_name}") | .app_id',
-        ],
-        check=False,
-    )
-    if result.returncode == 0 and result.stdout.strip():
-        # Return first matching app_id
-        return result.stdout.strip().split("\n")[0]
-    return None
+    """Get GitHub App ID by name.
+
+    Found IDs are kept in the persisted cache (24h expiry), so repeated runs
+    skip the installations request.
+    """
+    key = f"app-id:{org}/{bypass_actor_name}"
+    entry = _etag_cache.get(key)
+    if entry and entry.get("app_id"):
+        return entry["app_id"]
+
+    result = gh_get(f"orgs/{org}/installations")
+    if not result.ok:
+        return None
+    installations = result.json().get("installations", [])
+    app_id = next((i["app_id"] for i in installations if i.get("app_slug") == bypass_actor_name), None)
+    if app_id is None:
+        return None
+    _etag_cache[key] = {"app_id": str(app_id), "fetched_at": time.time()}
+    return str(app_id)
 
 
 def uses_merge_queue(config: dict, repo: str | None) -> bool:
@@ -187,41 +343,88 @@ def build_ruleset_payload(
     return payload
 
 
-def get_existing_ruleset(org: str, repo: str, ruleset_name: str) -> dict | None:
-    """Get existing ruleset by name."""
-    result = run_gh(
-        ["api", f"repos/{org}/{repo}/rulesets"],
-        check=False,
-    )
-    if result.returncode != 0:
+def list_rulesets(org: str, repo: str) -> list[dict] | None:
+    """List a repository's rulesets (summary entries), or None on failure."""
+    result = gh_get(f"repos/{org}/{repo}/rulesets")
+    if not result.ok:
         return None
+    return result.json()
+
+
+def fetch_all_existing_rulesets(org: str, repos: list[str], ruleset_name: str) -> dict[str, dict | None]:
+    """Look up the rulesets of many repositories with batched GraphQL queries.
+
+    Each query aliases up to GRAPHQL_BATCH_SIZE repositories. Every answered
+    repository's ruleset list is stored in _GH_GET_CACHE in the shape of the
+    REST list endpoint, so the per-repo lookups that follow are cache hits.
+    Repositories the query could not answer are left to the REST path.
+
+    Returns the {"id", "name"} summary of ruleset_name (or None) per answered repo.
+    """
+    found: dict[str, dict | None] = {}
+    for start in range(0, len(repos), GRAPHQL_BATCH_SIZE):
+        chunk = repos[start:start + GRAPHQL_BATCH_SIZE]
+        fields = " ".join(
+            f"r{i}: repository(owner: {json.dumps(org)}, name: {json.dumps(repo)}) "
+            "{ rulesets(first: 100) { nodes { databaseId name } } }"
+            for i, repo in enumerate(chunk)
+        )
+        result = send("POST", "graphql", json.dumps({"query": f"query {{ {fields} }}"}).encode())
+        if not result.ok:
+            log_warn(f"GraphQL ruleset prefetch failed (HTTP {result.status}); using REST lookups")
+            continue
+        data = result.json().get("data") or {}
+        for i, repo in enumerate(chunk):
+            node = data.get(f"r{i}")
+            if not node or node.get("rulesets") is None:
+                continue
+            summaries = [
+                {"id": ruleset["databaseId"], "name": ruleset["name"]}
+                for ruleset in node["rulesets"]["nodes"]
+            ]
+            with _GH_GET_CACHE_LOCK:
+                _GH_GET_CACHE[f"repos/{org}/{repo}/rulesets"] = json.dumps(summaries)
+            found[repo] = next((r for r in summaries if r["name"] == ruleset_name), None)
+    return found
+
 
-    rulesets = json.loads(result.stdout)
-    for ruleset in rulesets:
-        if ruleset.get("name") == ruleset_name:
-            # Fetch full ruleset details
-            ruleset_id = ruleset["id"]
-            detail_result = run_gh(
-                ["api", f"repos/{org}/{repo}/rulesets/{ruleset_id}"],
-                check=False,
-            )
-            if detail_result.returncode == 0:
-                return json.loads(detail_result.stdout)
+def get_existing_ruleset(org: str, repo: str, ruleset_name: str) -> dict | None:
+    """Get existing ruleset by name.
+
+    The list endpoint only returns summaries today; should an entry already
+    carry rules and conditions it is used as-is, saving the detail request.
+    """
+    for ruleset in list_rulesets(org, repo) or []:
+        if ruleset.get("name") != ruleset_name:
+            continue
+        if "rules" in ruleset and "conditions" in ruleset:
+            return ruleset
+
+        # Fetch full ruleset details
+        detail_result = gh_get(f"repos/{org}/{repo}/rulesets/{ruleset['id']}")
+        if detail_result.ok:
+            return detail_result.json()
     return None
 
 
+def remember_ruleset(org: str, repo: str, response: str) -> None:
+    """Cache a PUT/POST response body as the ruleset's detail GET.
+
+    GitHub answers ruleset writes with the full stored ruleset, so the
+    verification that follows an apply needs no separate detail request.
+    """
+    try:
+        ruleset_id = json.loads(response)["id"]
+    except (ValueError, KeyError, TypeError):
+        return
+    with _GH_GET_CACHE_LOCK:
+        _GH_GET_CACHE[f"repos/{org}/{repo}/rulesets/{ruleset_id}"] = response
+
+
 def get_existing_ruleset_id(org: str, repo: str, ruleset_name: str) -> str | None:
     """Check if ruleset exists and return its ID."""
-    result = run_gh(
-        [
-            "api", f"repos/{org}/{repo}/rulesets",
-            "--jq", f'.[] | select(.name == "{ruleset_name}") | .id',
-        ],
-        check=False,
-    )
-    if result.returncode == 0 and result.stdout.strip():
-        return result.stdout.strip()
-    return None
+    ruleset_id = next((r["id"] for r in list_rulesets(org, repo) or [] if r.get("name") == ruleset_name), None)
+    return None if ruleset_id is None else str(ruleset_id)
 
 
 def normalize_rule_parameters(rule: dict) -> dict:
@@ -326,8 +529,11 @@ def apply_ruleset(
     bypass_actor_id: str,
     required_checks_override: list[str] | None = None,
     required_reviews_override: int | None = None,
-) -> None:
-    """Create or update ruleset for a repository."""
+) -> bool:
+    """Create or update ruleset for a repository.
+
+    Returns True if the ruleset is in place (written or already up to date).
+    """
     ruleset_name = config["ruleset"]["name"]
     log_info(f"Processing {org}/{repo}...")
 
@@ -335,29 +541,53 @@ def apply_ruleset(
         config, bypass_actor_id, required_checks_override, required_reviews_override,
         merge_queue_enabled=uses_merge_queue(config, repo),
     )
-    payload_json = json.dumps(payload)
+
+    # Idempotent re-runs should not write: skip when nothing would change
+    existing = get_existing_ruleset(org, repo, ruleset_name)
+    if existing is not None and (
+        normalize_ruleset_for_comparison(existing) == normalize_ruleset_for_comparison(payload)
+    ):
+        log_info("  ✓ Already up to date")
+        return True
 
     existing_id = get_existing_ruleset_id(org, repo, ruleset_name)
 
     if existing_id:
         log_info(f"  Updating existing ruleset (ID: {existing_id})")
-        result = run_gh(
-            ["api", "-X", "PUT", f"repos/{org}/{repo}/rulesets/{existing_id}", "--input", "-"],
-            check=False,
-            input_data=payload_json,
-        )
+        result = gh_request("PUT", f"repos/{org}/{repo}/rulesets/{existing_id}", payload)
     else:
         log_info("  Creating new ruleset")
-        result = run_gh(
-            ["api", "-X", "POST", f"repos/{org}/{repo}/rulesets", "--input", "-"],
-            check=False,
-            input_data=payload_json,
-        )
+        result = gh_request("POST", f"repos/{org}/{repo}/rulesets", payload)
 
-    if result.returncode == 0:
+    if result.ok:
+        remember_ruleset(org, repo, result.body)
         log_info("  ✓ Done")
-    else:
-        log_warn(f"  ⚠ Failed: {result.stderr}")
+        return True
+    log_warn(f"  ⚠ Failed: HTTP {result.status} {result.body}")
+    return False
+
+
+def load_checkpoint(state_path: Path, digest: str) -> dict:
+    """Load batch progress, or start fresh if it belongs to another config."""
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = None
+    if not isinstance(state, dict) or state.get("config_digest") != digest:
+        return {"config_digest": digest, "completed": [], "failed": []}
+    return state
+
+
+def save_checkpoint(state_path: Path, state: dict) -> None:
+    """Durably write batch progress (fsync, then atomic rename)."""
+    state["updated_at"] = datetime.now(timezone.utc).isoformat()
+    tmp_path = state_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, state_path)
 
 
 def verify_ruleset(
@@ -543,14 +773,11 @@ def delete_ruleset_by_name(org: str, repo: str, ruleset_name: str) -> bool:
     ruleset_id = get_existing_ruleset_id(org, repo, ruleset_name)
     if not ruleset_id:
         return False
-    result = run_gh(
-        ["api", "-X", "DELETE", f"repos/{org}/{repo}/rulesets/{ruleset_id}"],
-        check=False,
-    )
-    if result.returncode == 0:
+    result = gh_request("DELETE", f"repos/{org}/{repo}/rulesets/{ruleset_id}")
+    if result.ok:
         log_info(f"  ✓ Removed ruleset '{ruleset_name}' (ID: {ruleset_id})")
         return True
-    log_warn(f"  ⚠ Failed to remove '{ruleset_name}': {result.stderr}")
+    log_warn(f"  ⚠ Failed to remove '{ruleset_name}': HTTP {result.status} {result.body}")
     return False
 
 
@@ -569,28 +796,21 @@ def apply_merge_queue_ruleset(org: str, repo: str, config: dict, bypass_actor_id
     # (still PR-protected) rather than the bypass-less legacy queue.
     delete_ruleset_by_name(org, repo, LEGACY_MERGE_QUEUE_NAME)
 
-    payload_json = json.dumps(build_merge_queue_payload(config, bypass_actor_id))
+    payload = build_merge_queue_payload(config, bypass_actor_id)
     existing_id = get_existing_ruleset_id(org, repo, name)
 
     if existing_id:
         log_info(f"  Updating existing '{name}' (ID: {existing_id})")
-        result = run_gh(
-            ["api", "-X", "PUT", f"repos/{org}/{repo}/rulesets/{existing_id}", "--input", "-"],
-            check=False,
-            input_data=payload_json,
-        )
+        result = gh_request("PUT", f"repos/{org}/{repo}/rulesets/{existing_id}", payload)
     else:
         log_info(f"  Creating '{name}'")
-        result = run_gh(
-            ["api", "-X", "POST", f"repos/{org}/{repo}/rulesets", "--input", "-"],
-            check=False,
-            input_data=payload_json,
-        )
+        result = gh_request("POST", f"repos/{org}/{repo}/rulesets", payload)
 
-    if result.returncode == 0:
+    if result.ok:
+        remember_ruleset(org, repo, result.body)
         log_info("  ✓ Done")
     else:
-        log_warn(f"  ⚠ Failed: {result.stderr}")
+        log_warn(f"  ⚠ Failed: HTTP {result.status} {result.body}")
 
 
 def verify_merge_queue_ruleset(org: str, repo: str, config: dict, bypass_actor_id: str) -> bool:
@@ -693,43 +913,36 @@ def list_workflow_checks(org: str, repo: str) -> list[dict]:
     changes from 'job' to 'job / callee_job').
     """
     # Get recent workflow runs (most recent first)
-    result = run_gh(
-        ["api", f"repos/{org}/{repo}/actions/runs", "--jq", ".workflow_runs[:20]"],
-        check=False,
-    )
-    if result.returncode != 0 or not result.stdout.strip():
+    result = gh_get(f"repos/{org}/{repo}/actions/runs?per_page=20")
+    if not result.ok:
         return []
 
-    runs = json.loads(result.stdout)
-
-    # Track which workflows we've seen to only use the most recent run per workflow
-    seen_workflows: set[str] = set()
-    checks: dict[str, dict] = {}
+    runs = result.json().get("workflow_runs", [])
 
+    # Only the most recent run of each workflow is inspected
+    latest_runs: dict[str, Any] = {}
     for run in runs:
-        run_id = run.get("id")
-        workflow_name = run.get("name", "Unknown")
+        latest_runs.setdefault(run.get("name", "Unknown"), run.get("id"))
 
-        # Skip if we already processed a more recent run of this workflow
-        if workflow_name in seen_workflows:
-            continue
-        seen_workflows.add(workflow_name)
+    # Job lists are independent; fetch them concurrently. pool.map keeps run
+    # order, so the merge below is as deterministic as the serial loop was.
+    def fetch_jobs(run_id: Any) -> list[dict]:
+        jobs_result = gh_get(f"repos/{org}/{repo}/actions/runs/{run_id}/jobs")
+        return jobs_result.json().get("jobs", []) if jobs_result.ok else []
 
-        # Get jobs for this run
-        jobs_result = run_gh(
-            ["api", f"repos/{org}/{repo}/actions/runs/{run_id}/jobs", "--jq", ".jobs"],
-            check=False,
-        )
-        if jobs_result.returncode == 0 and jobs_result.stdout.strip():
-            jobs = json.loads(jobs_result.stdout)
-            for job in jobs:
-                job_name = job.get("name")
-                if job_name and job_name not in checks:
-                    checks[job_name] = {
-                        "name": job_name,
-                        "workflow": workflow_name,
-                        "conclusion": job.get("conclusion"),
-                    }
+    with ThreadPoolExecutor(max_workers=JOB_FETCH_WORKERS) as pool:
+        run_jobs = list(pool.map(fetch_jobs, latest_runs.values()))
+
+    checks: dict[str, dict] = {}
+    for workflow_name, jobs in zip(latest_runs, run_jobs, strict=True):
+        for job in jobs:
+            job_name = job.get("name")
+            if job_name and job_name not in checks:
+                checks[job_name] = {
+                    "name": job_name,
+                    "workflow": workflow_name,
+                    "conclusion": job.get("conclusion"),
+                }
 
     return list(checks.values())
 
@@ -743,6 +956,7 @@ def parse_args() -> argparse.Namespace:
 Examples:
   %(prog)s                                Process all repos in config.json
   %(prog)s --repo cui-java-tools --diff   Show diff for single repo
+  %(prog)s --diff-all                     Show diff for all repos in config
   %(prog)s --repo cui-java-tools --apply  Apply ruleset to single repo
   %(prog)s --repo my-repo --list-checks   List available workflow checks
   %(prog)s --repo my-repo --apply --required-checks verify --required-reviews 0
@@ -769,6 +983,11 @@ Examples:
         action="store_true",
         help="Apply changes (required when using --repo)",
     )
+    parser.add_argument(
+        "--diff-all",
+        action="store_true",
+        help="Output the diff for every repository in config as one JSON list (don't apply)",
+    )
     parser.add_argument(
         "--list-checks",
         action="store_true",
@@ -799,6 +1018,18 @@ Examples:
         help="Remove the merge-queue ruleset (and any legacy plan-marshall-merge-queue). "
         "With --repo targets that repo; without --repo targets all merge_queue_repos.",
     )
+    parser.add_argument(
+        "--resume",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Batch mode: skip repositories completed by an interrupted earlier run "
+        "(checkpointed in state.json next to the config; default: on)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Batch mode: ignore the checkpoint and process every repository",
+    )
     return parser.parse_args()
 
 
@@ -834,6 +1065,11 @@ def main() -> None:
         log_error("Cannot use --enable-merge-queue and --disable-merge-queue together")
         sys.exit(1)
 
+    if args.diff_all and (args.repo or args.diff or args.apply or args.list_checks or merge_queue_mode):
+        log_error("--diff-all covers all configured repositories and cannot be combined "
+                  "with --repo or other modes")
+        sys.exit(1)
+
     if args.repo and not (args.diff or args.apply or args.list_checks or merge_queue_mode):
         log_error("When using --repo, you must specify --diff, --apply, --list-checks, "
                   "--enable-merge-queue, or --disable-merge-queue")
@@ -844,6 +1080,8 @@ def main() -> None:
         sys.exit(1)
 
     check_dependencies()
+    load_etag_cache()
+    atexit.register(save_etag_cache)
 
     # Determine config file path
     script_dir = Path(__file__).parent
@@ -878,8 +1116,8 @@ def main() -> None:
         print(json.dumps(checks, indent=2))
         return
 
-    # Get bypass actor ID (non-interactive for diff mode)
-    interactive = not args.diff
+    # Get bypass actor ID (non-interactive for diff modes)
+    interactive = not (args.diff or args.diff_all)
     bypass_actor_id = get_bypass_actor_id(org, bypass_actor_name, config_app_id=config_app_id, interactive=interactive)
 
     # Single repo diff mode
@@ -888,6 +1126,20 @@ def main() -> None:
         print(json.dumps(diff, indent=2))
         return
 
+    # Drift report over all repositories: rulesets are prefetched in bulk,
+    # so each compute_diff mostly needs only the detail request
+    if args.diff_all:
+        repos = config["repositories"]
+        fetch_all_existing_rulesets(org, repos, config["ruleset"]["name"])
+
+        def diff_one(repo: str) -> dict:
+            return compute_diff(org, repo, config, bypass_actor_id, required_checks_override, required_reviews_override)
+
+        with ThreadPoolExecutor(max_workers=DIFF_WORKERS) as pool:
+            diffs = list(pool.map(diff_one, repos))
+        print(json.dumps(diffs, indent=2))
+        return
+
     # Single repo apply mode
     if args.repo and args.apply:
         apply_ruleset(org, args.repo, config, bypass_actor_id, required_checks_override, required_reviews_override)
@@ -906,11 +1158,47 @@ def main() -> None:
     log_info(f"Ruleset: {config['ruleset']['name']} targeting '{config['ruleset']['branch_pattern']}'")
     print(file=sys.stderr)
 
-    # Process each repository
-    for repo in config["repositories"]:
-        apply_ruleset(org, repo, config, bypass_actor_id)
+    # Progress is checkpointed next to the config so an interrupted run
+    # resumes where it stopped; the digest ties it to this exact config.
+    state_path = config_path.parent / STATE_FILENAME
+    digest = hashlib.sha256(
+        (json.dumps(config, sort_keys=True) + bypass_actor_id).encode()
+    ).hexdigest()
+    if args.resume and not args.force:
+        state = load_checkpoint(state_path, digest)
+    else:
+        state = {"config_digest": digest, "completed": [], "failed": []}
+    done = set(state["completed"])
+    pending = [repo for repo in config["repositories"] if repo not in done]
+    if len(pending) < len(config["repositories"]):
+        log_info(f"Resuming: {len(config['repositories']) - len(pending)} repositories already done "
+                 f"({state_path.name}; use --force to redo them)")
+    state["failed"] = []
+    state_lock = threading.Lock()
+
+    # One GraphQL round-trip per GRAPHQL_BATCH_SIZE repos replaces the
+    # per-repo ruleset list requests
+    fetch_all_existing_rulesets(org, pending, config["ruleset"]["name"])
+
+    # Process repositories concurrently; logs are replayed in config order
+    def apply_one(repo: str) -> tuple[Any, list[str]]:
+        outcome = run_captured(apply_ruleset, org, repo, config, bypass_actor_id)
+        with state_lock:
+            state["completed" if outcome[0] else "failed"].append(repo)
+            save_checkpoint(state_path, state)
+        return outcome
+
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+        for _, lines in pool.map(apply_one, pending):
+            for line in lines:
+                print(line, file=sys.stderr)
 
     print(file=sys.stderr)
+    if state["failed"]:
+        log_error(f"{len(state['failed'])} repositories failed: {', '.join(state['failed'])}")
+        log_error("Re-run to retry them; completed repositories are skipped")
+        sys.exit(1)
+    state_path.unlink(missing_ok=True)
     log_info("All rulesets applied successfully!")
 
 
@@ -9,17 +9,24 @@ Usage:
     ./pw build compile workflow             # Single module (workflow scripts)
     ./pw build test                         # All tests
     ./pw build test repo-admin              # Single test directory
-    ./pw build verify                       # Full verification
+    ./pw build verify                       # Full verification (skipped if nothing changed)
+    ./pw build verify --force               # Full verification, even if nothing changed
+    BUILD_DMYPY=1 ./pw build compile        # Type-check through the resident mypy daemon
 """
 
 import argparse
+import importlib.util
+import json
+import os
+import shutil
 import subprocess
 import sys
+from itertools import chain
 from pathlib import Path
 
 # Module definitions - maps module names to their source paths
-MODULES = {
-    "workflow": [
+MODULES: dict[str, tuple[str, ...]] = {
+    "workflow": (
         ".github/actions/read-project-config/read-config.py",
         ".github/actions/release-guard/release-guard.py",
         ".github/actions/assemble-test-reports/assemble-reports.py",
@@ -32,33 +39,39 @@ MODULES = {
         "workflow-scripts/update-consumer-dependency.py",
         "workflow-scripts/check-maven-central.py",
         "workflow-scripts/sweep-dependabot-prs.py",
-    ],
-    "repo-admin": [
+    ),
+    "repo-admin": (
         "repo-settings/setup-repo-settings.py",
+        "repo-settings/verify-org-integration.py",
+        "repo-settings/github_api.py",
         "branch-protection/setup-branch-protection.py",
-    ],
+    ),
 }
 
-# All source paths for full compilation
-ALL_SOURCES = [
-    ".github/actions/read-project-config/read-config.py",
-    ".github/actions/release-guard/release-guard.py",
-    ".github/actions/assemble-test-reports/assemble-reports.py",
-    ".github/actions/assemble-test-reports/generate-overview-index.py",
-    "workflow-scripts/update-workflow-references.py",
-    "workflow-scripts/check-internal-pinning.py",
-    "workflow-scripts/update-consumer-repo.py",
-    "workflow-scripts/verify-consumer-prs.py",
-    "workflow-scripts/consumer_update_utils.py",
-    "workflow-scripts/update-consumer-dependency.py",
-    "workflow-scripts/check-maven-central.py",
-    "workflow-scripts/sweep-dependabot-prs.py",
-    "repo-settings/setup-repo-settings.py",
-    "branch-protection/setup-branch-protection.py",
-]
+# All source paths for full compilation, derived so no module can be left out;
+# a path listed under two modules is still checked only once
+ALL_SOURCES: tuple[str, ...] = tuple(dict.fromkeys(chain.from_iterable(MODULES.values())))
 
 TEST_DIR = Path("test")
 
+# Digest of the inputs of the last successful verify, per module
+VERIFY_STAMP = Path(".cache/verify-stamp.json")
+# Files outside the sources and tests that change verify's outcome
+VERIFY_INPUTS = ("build.py", "pyproject.toml", "uv.lock")
+# Set to a non-empty value to type-check through the mypy daemon (left running)
+DMYPY_ENV = "BUILD_DMYPY"
+
+
+def tool(name: str) -> list[str]:
+    """Command prefix for a dev tool.
+
+    The tools live in the pyprojectx environment, which is on PATH, not in the
+    project .venv build.py runs in. Calling the executable directly skips a
+    nested ``uv run`` for every step; ``uv run`` remains the fallback.
+    """
+    executable = shutil.which(name)
+    return [executable] if executable else ["uv", "run", name]
+
 
 def run(cmd: list[str], description: str) -> int:
     """Run a command and return exit code."""
@@ -68,7 +81,7 @@ def run(cmd: list[str], description: str) -> int:
     return result.returncode
 
 
-def get_module_sources(module: str | None) -> list[str]:
+def get_module_sources(module: str | None) -> tuple[str, ...]:
     """Get source paths, optionally filtered by module."""
     if module:
         if module not in MODULES:
@@ -93,13 +106,34 @@ def get_test_path(module: str | None) -> str:
 def cmd_compile(module: str | None) -> int:
     """Run mypy on production sources."""
     sources = get_module_sources(module)
-    return run(["uv", "run", "mypy"] + sources, f'compile: mypy {" ".join(sources)}')
+    if os.environ.get(DMYPY_ENV):
+        # dmypy keeps the analyzed program in a resident daemon (started on first use),
+        # so repeated compiles only re-check what changed; stop it with ./pw clean
+        return run([*tool("dmypy"), "run", "--", *sources], f'compile: dmypy run {" ".join(sources)}')
+    return run([*tool("mypy"), *sources], f'compile: mypy {" ".join(sources)}')
+
+
+def has_xdist(pytest_cmd: list[str]) -> bool:
+    """Whether pytest-xdist is installed next to the pytest that runs the tests.
+
+    The plugin lives in pytest's environment, not in build.py's interpreter, so
+    look for its package in that environment's site-packages rather than
+    starting an extra pytest process. ``uv run`` uses build.py's own environment.
+    """
+    if pytest_cmd[0] == "uv":
+        return importlib.util.find_spec("xdist") is not None
+    env = Path(pytest_cmd[0]).resolve().parent.parent
+    return any(env.glob("lib/python3*/site-packages/xdist")) or (env / "Lib" / "site-packages" / "xdist").is_dir()
 
 
 def cmd_test(module: str | None) -> int:
     """Run pytest on test sources."""
     path = get_test_path(module)
-    return run(["uv", "run", "pytest", path], f"test: pytest {path}")
+    cmd = tool("pytest")
+    # Spread test files over all cores; loadfile keeps each file's fixtures on one worker
+    if has_xdist(cmd):
+        cmd += ["-n", "auto", "--dist=loadfile"]
+    return run(cmd + [path], f"test: pytest {path}")
 
 
 def cmd_quality_gate(module: str | None) -> int:
@@ -107,17 +141,73 @@ def cmd_quality_gate(module: str | None) -> int:
     sources = get_module_sources(module)
     test_path = get_test_path(module) if module else str(TEST_DIR)
 
-    paths = sources.copy()
-    if Path(test_path).exists():
-        paths.append(test_path)
+    paths = [*sources, test_path] if Path(test_path).exists() else list(sources)
+
+    return run([*tool("ruff"), "check", *paths], f'quality-gate: ruff check {" ".join(paths)}')
+
+
+def verify_files(dirs: list[str]) -> list[Path]:
+    """List the files under dirs that git tracks or would track.
+
+    Covers the config files and helper scripts next to the listed sources, not
+    only the sources themselves. Falls back to walking the directories when
+    git is unavailable.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard", "--", *dirs],
+            capture_output=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return [
+            p for d in dirs for p in Path(d).rglob("*") if p.is_file() and "__pycache__" not in p.parts
+        ]
+    return [Path(p) for p in dict.fromkeys(result.stdout.decode().split("\0")) if p]
+
+
+def verify_digest(module: str | None) -> str:
+    """Hash every file verify reads: the script and test directories and build config."""
+    # blake3 hashes several times faster when installed; sha256 otherwise
+    try:
+        from blake3 import blake3 as _hasher
+    except ImportError:
+        from hashlib import sha256 as _hasher  # type: ignore[assignment]
+
+    files = [Path(p) for p in VERIFY_INPUTS]
+    files += verify_files([*dict.fromkeys(str(Path(p).parent) for p in get_module_sources(module)), str(TEST_DIR)])
+    digest = _hasher()
+    for path in sorted(files):
+        digest.update(str(path).encode() + b"\0")
+        if path.exists():
+            digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_verify_stamp() -> dict:
+    """Return the recorded digests of successful verifies, keyed by module."""
+    try:
+        stamp = json.loads(VERIFY_STAMP.read_text())
+    except (OSError, ValueError):
+        return {}
+    return stamp if isinstance(stamp, dict) else {}
 
-    return run(["uv", "run", "ruff", "check"] + paths, f'quality-gate: ruff check {" ".join(paths)}')
 
+def cmd_verify(module: str | None, force: bool = False) -> int:
+    """Run full verification: compile + quality-gate + test.
 
-def cmd_verify(module: str | None) -> int:
-    """Run full verification: compile + quality-gate + test."""
+    Skipped when nothing verify reads has changed since it last passed.
+    """
     print(f'=== verify: {"all" if not module else module} ===')
 
+    key = module or "all"
+    digest = verify_digest(module)
+    stamps = load_verify_stamp()
+    if not force and stamps.get(key) == digest:
+        print("=== verify: up to date ===")
+        return 0
+
     exit_code = cmd_compile(module)
     if exit_code != 0:
         print("verify: compile failed", file=sys.stderr)
@@ -133,20 +223,42 @@ def cmd_verify(module: str | None) -> int:
         print("verify: test failed", file=sys.stderr)
         return exit_code
 
+    stamps[key] = digest
+    VERIFY_STAMP.parent.mkdir(exist_ok=True)
+    VERIFY_STAMP.write_text(json.dumps(stamps, indent=2))
+
     print("=== verify: SUCCESS ===")
     return 0
 
 
+def remove_tree(path: Path) -> None:
+    """Delete a directory tree, preferring the platform's native tool.
+
+    A populated .venv holds tens of thousands of files; rm/rmdir unlink them
+    far faster than shutil.rmtree's per-entry Python loop.
+    """
+    if os.name == "nt":
+        native = ["cmd", "/c", "rmdir", "/s", "/q", str(path)]
+    else:
+        native = ["rm", "-rf", str(path)]
+    try:
+        subprocess.run(native, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    if path.exists():
+        shutil.rmtree(path)
+
+
 def cmd_clean() -> int:
     """Clean build artifacts."""
-    dirs = [".venv", ".pytest_cache", ".mypy_cache", ".ruff_cache"]
+    if Path(".dmypy.json").exists():
+        run(tool("dmypy") + ["stop"], "clean: stop mypy daemon")
+    dirs = [".venv", ".pytest_cache", ".mypy_cache", ".ruff_cache", ".cache"]
     for d in dirs:
         path = Path(d)
         if path.exists():
             print(f"Removing {d}")
-            import shutil
-
-            shutil.rmtree(path)
+            remove_tree(path)
     return 0
 
 
@@ -160,7 +272,8 @@ Examples:
   %(prog)s compile workflow           # mypy workflow module only
   %(prog)s test                       # pytest test/
   %(prog)s test repo-admin            # pytest test/repo-admin
-  %(prog)s verify                     # Full verification
+  %(prog)s verify                     # Full verification (skipped if unchanged)
+  %(prog)s verify --force             # Full verification, even if unchanged
 
 Modules:
   workflow    - Workflow scripts (.github/actions/*, workflow-scripts/*)
@@ -185,6 +298,7 @@ Modules:
     # verify
     p = subparsers.add_parser("verify", help="Full verification (compile + quality-gate + test)")
     p.add_argument("module", nargs="?", help="Module name (workflow, repo-admin)")
+    p.add_argument("--force", action="store_true", help="Verify even if nothing changed since the last success")
 
     # clean
     subparsers.add_parser("clean", help="Remove build artifacts")
@@ -198,7 +312,7 @@ Modules:
     elif args.command == "quality-gate":
         sys.exit(cmd_quality_gate(args.module))
     elif args.command == "verify":
-        sys.exit(cmd_verify(args.module))
+        sys.exit(cmd_verify(args.module, args.force))
     elif args.command == "clean":
         sys.exit(cmd_clean())
 
@@ -0,0 +1,191 @@
+"""Shared GitHub REST client for the repository admin scripts.
+
+Provides:
+- ApiResponse, the status/body/ETag of a response
+- The API token (GH_TOKEN/GITHUB_TOKEN, else `gh auth token`)
+- One keep-alive HTTPS connection per thread to api.github.com
+- Pacing against the primary rate limit and retries of throttled requests
+
+Used by setup-repo-settings.py, verify-org-integration.py and
+branch-protection/setup-branch-protection.py.
+"""
+
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+# Prefer orjson's parser for API responses when installed; stdlib json otherwise
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads  # type: ignore[assignment]
+
+API_HOST = "api.github.com"
+API_VERSION = "2022-11-28"
+
+# One keep-alive HTTPS connection per thread, reused for every API call.
+_http = threading.local()
+
+# Throttled requests (429, or 403 from a secondary rate limit) are retried up to
+# RATE_LIMIT_RETRIES times; without a Retry-After hint the wait doubles from
+# RATE_LIMIT_BACKOFF seconds.
+RATE_LIMIT_RETRIES = 4
+RATE_LIMIT_BACKOFF = 2.0
+
+# Primary rate-limit budget as last reported by GitHub, shared by all threads.
+# Requests pause for the window reset once fewer than RATE_LIMIT_FLOOR remain,
+# instead of running the budget dry and waiting out 403s.
+RATE_LIMIT_FLOOR = 50
+_rate_state: dict[str, Any] = {"remaining": None, "reset": 0.0}
+_rate_lock = threading.Lock()
+
+
+def _stderr_warn(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+# Receives the throttling warnings; scripts point it at their own log_warn so the
+# lines follow their formatting and per-thread log capture.
+warn: Callable[[str], None] = _stderr_warn
+
+
+class ApiResponse(NamedTuple):
+    """Status and raw body of a GitHub API response (status 0: no response)."""
+
+    status: int
+    body: str
+    etag: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def json(self) -> Any:
+        return _json_loads(self.body)
+
+
+@lru_cache(maxsize=1)
+def gh_token() -> str:
+    """Return the API token: GH_TOKEN/GITHUB_TOKEN, else `gh auth token`."""
+    token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+    if token:
+        return token
+    result = subprocess.run(["gh", "auth", "token"], capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+def transmit(method: str, path: str, payload: bytes | None, headers: dict) -> tuple[ApiResponse, dict]:
+    """Send one request over this thread's connection.
+
+    Returns the response and its headers (lower-cased names).
+    """
+    retried = False
+    while True:
+        conn = getattr(_http, "conn", None)
+        if conn is None:
+            conn = _http.conn = http.client.HTTPSConnection(API_HOST, timeout=30)
+        try:
+            conn.request(method, f"/{path}", body=payload, headers=headers)
+            response = conn.getresponse()
+            body = response.read().decode()
+            response_headers = {k.lower(): v for k, v in response.getheaders()}
+            return ApiResponse(response.status, body, response_headers.get("etag", "")), response_headers
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            _http.conn = None
+            # A keep-alive connection the server already dropped fails on
+            # first use; retry that once on a fresh connection.
+            stale = isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError))
+            if retried or not stale:
+                return ApiResponse(0, str(e)), {}
+            retried = True
+
+
+def _track_rate_limit(headers: dict) -> None:
+    """Record the primary rate-limit budget reported by a response."""
+    try:
+        remaining = int(headers["x-ratelimit-remaining"])
+        reset = float(headers["x-ratelimit-reset"])
+    except (KeyError, ValueError):
+        return
+    with _rate_lock:
+        _rate_state["remaining"] = remaining
+        _rate_state["reset"] = reset
+
+
+def _pace() -> None:
+    """Wait for the rate-limit window to reset while the budget is below the floor."""
+    with _rate_lock:
+        remaining, reset = _rate_state["remaining"], _rate_state["reset"]
+    if remaining is None or remaining >= RATE_LIMIT_FLOOR:
+        return
+    wait = reset - time.time() + 1
+    if wait > 0:
+        warn(f"Only {remaining} API requests left; waiting {wait:.0f}s for the rate limit reset")
+        time.sleep(wait)
+
+
+def retry_delay(response: ApiResponse, headers: dict, attempt: int) -> float | None:
+    """Seconds to wait before retrying a throttled response, else None.
+
+    A 403 only counts as throttling when GitHub says so (Retry-After, an
+    exhausted budget or a rate-limit message); other 403s are permission errors.
+    """
+    if response.status not in (403, 429):
+        return None
+    if "retry-after" in headers:
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+    elif headers.get("x-ratelimit-remaining") == "0":
+        try:
+            return max(float(headers["x-ratelimit-reset"]) - time.time(), 0.0) + 1
+        except (KeyError, ValueError):
+            pass
+    elif response.status == 403 and "rate limit" not in response.body.lower():
+        return None
+    return RATE_LIMIT_BACKOFF * 2**attempt
+
+
+def send(
+    method: str, path: str, payload: bytes | None = None, extra_headers: dict | None = None
+) -> ApiResponse:
+    """Send an API request, pacing it against GitHub's rate limits.
+
+    When fewer than RATE_LIMIT_FLOOR requests remain in the window, waits for
+    the reset first; a throttled response is retried with backoff.
+    """
+    headers = {
+        "Authorization": f"Bearer {gh_token()}",
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": API_VERSION,
+        "User-Agent": "cuioss-organization",
+    }
+    if payload is not None:
+        headers["Content-Type"] = "application/json"
+    if extra_headers:
+        headers.update(extra_headers)
+
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        _pace()
+        response, response_headers = transmit(method, path, payload, headers)
+        _track_rate_limit(response_headers)
+        delay = retry_delay(response, response_headers, attempt)
+        if delay is None or attempt == RATE_LIMIT_RETRIES:
+            break
+        warn(f"Rate limited on {method} /{path}; retrying in {delay:.0f}s")
+        time.sleep(delay)
+    return response
+
+
+def request(method: str, path: str, body: dict | None = None) -> ApiResponse:
+    """Send a REST request with an optional JSON body."""
+    return send(method, path, None if body is None else json.dumps(body).encode())
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """Apply consistent repository settings across cuioss repositories.
 
-Requires: gh cli (https://cli.github.com/)
+Requires: gh cli (https://cli.github.com/), used for the auth check, the token,
+repository listing and labels. REST/GraphQL calls go directly to
+api.github.com over a keep-alive HTTPS connection per thread; GH_TOKEN or
+GITHUB_TOKEN, when set, is used instead of `gh auth token`.
 
 Usage:
     ./setup-repo-settings.py                          # Process config.json repos, or the whole org if that list is empty
@@ -10,10 +13,29 @@ Usage:
 """
 
 import argparse
+import atexit
+import hashlib
 import json
+import os
+import re
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
+
+import github_api
+from github_api import ApiResponse, send
+from github_api import request as gh_request
+
+# Prefer orjson's parser for the cache files when installed; stdlib json otherwise
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads  # type: ignore[assignment]
 
 # ANSI colors
 GREEN = "\033[0;32m"
@@ -23,20 +45,49 @@ BLUE = "\033[0;34m"
 NC = "\033[0m"
 
 
+# Batch mode configures up to this many repositories at once; the work is
+# almost entirely waiting on GitHub, but secondary rate limits cap bursts.
+MAX_BATCH_WORKERS = 8
+
+# Per-thread log capture for batch workers, so each repository's lines are
+# printed as one block instead of interleaving with other workers.
+_log_capture = threading.local()
+
+
+def _emit(line: str) -> None:
+    captured = getattr(_log_capture, "lines", None)
+    if captured is not None:
+        captured.append(line)
+    else:
+        print(line, file=sys.stderr)
+
+
 def log_info(msg: str) -> None:
-    print(f"{GREEN}[INFO]{NC} {msg}", file=sys.stderr)
+    _emit(f"{GREEN}[INFO]{NC} {msg}")
 
 
 def log_warn(msg: str) -> None:
-    print(f"{YELLOW}[WARN]{NC} {msg}", file=sys.stderr)
+    _emit(f"{YELLOW}[WARN]{NC} {msg}")
 
 
 def log_error(msg: str) -> None:
-    print(f"{RED}[ERROR]{NC} {msg}", file=sys.stderr)
+    _emit(f"{RED}[ERROR]{NC} {msg}")
 
 
 def log_section(msg: str) -> None:
-    print(f"\n{BLUE}=== {msg} ==={NC}", file=sys.stderr)
+    _emit(f"\n{BLUE}=== {msg} ==={NC}")
+
+
+github_api.warn = log_warn
+
+
+def run_captured(func, *args) -> tuple[Any, list[str]]:
+    """Call func(*args), returning its result and the log lines it emitted."""
+    _log_capture.lines = []
+    try:
+        return func(*args), _log_capture.lines
+    finally:
+        _log_capture.lines = None
 
 
 def run_gh(args: list[str], check: bool = True) -> subprocess.CompletedProcess:
@@ -49,8 +100,76 @@ def run_gh(args: list[str], check: bool = True) -> subprocess.CompletedProcess:
     )
 
 
+# Per-user cache for state that outlives a single run
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "cuioss"
+DEPS_STAMP = CACHE_DIR / "gh-deps.stamp"
+DEPS_STAMP_TTL = 600
+
+# --diff --cache results per repository and config digest; writes to a repository
+# invalidate its entries, the TTL bounds drift from changes made elsewhere.
+DIFF_CACHE_DIR = CACHE_DIR / "repo-settings"
+DIFF_CACHE_TTL = 300
+
+# REST GET bodies with their ETags: API path -> {"etag", "body", "fetched_at"}.
+# Revalidated with If-None-Match; a 304 costs no primary rate limit.
+ETAG_CACHE_PATH = CACHE_DIR / "etags.json"
+ETAG_CACHE_TTL = 24 * 60 * 60
+_etag_cache: dict[str, dict] = {}
+
+
+def load_etag_cache() -> None:
+    """Load unexpired entries of the persisted ETag cache."""
+    try:
+        entries = _json_loads(ETAG_CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return
+    if not isinstance(entries, dict):
+        return
+    cutoff = time.time() - ETAG_CACHE_TTL
+    _etag_cache.update(
+        (path, entry) for path, entry in entries.items()
+        if isinstance(entry, dict) and entry.get("fetched_at", 0) >= cutoff
+    )
+
+
+def save_etag_cache() -> None:
+    """Write the ETag cache atomically; failures only cost future 304s."""
+    tmp_path = ETAG_CACHE_PATH.with_suffix(".tmp")
+    try:
+        ETAG_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(_etag_cache, f)
+        os.replace(tmp_path, ETAG_CACHE_PATH)
+    except OSError as e:
+        log_warn(f"Could not write {ETAG_CACHE_PATH}: {e}")
+
+
+def gh_get(path: str) -> ApiResponse:
+    """GET a REST path, conditional on the ETag of a previous response.
+
+    A 304 is answered with the stored body, as if GitHub had sent it again.
+    """
+    entry = _etag_cache.get(path)
+    result = send("GET", path, None, {"If-None-Match": entry["etag"]} if entry else None)
+    if result.status == 304 and entry:
+        return ApiResponse(200, entry["body"], entry["etag"])
+    if result.ok and result.etag:
+        _etag_cache[path] = {"etag": result.etag, "body": result.body, "fetched_at": time.time()}
+    return result
+
+
 def check_dependencies() -> None:
-    """Check that required dependencies are available."""
+    """Check that required dependencies are available.
+
+    A successful check is remembered in DEPS_STAMP for DEPS_STAMP_TTL seconds,
+    so repeated invocations (e.g. --diff in a loop) skip both gh probes.
+    """
+    try:
+        if time.time() - DEPS_STAMP.stat().st_mtime < DEPS_STAMP_TTL:
+            return
+    except OSError:
+        pass
+
     # Check gh cli
     try:
         subprocess.run(["gh", "--version"], capture_output=True, check=True)
@@ -64,11 +183,23 @@ def check_dependencies() -> None:
         log_error("Not authenticated with gh. Run: gh auth login")
         sys.exit(1)
 
+    try:
+        DEPS_STAMP.parent.mkdir(parents=True, exist_ok=True)
+        DEPS_STAMP.touch()
+    except OSError:
+        pass
+
 
 def load_config(config_path: Path) -> dict:
-    """Load configuration from JSON file."""
-    with open(config_path) as f:
-        return json.load(f)
+    """Load configuration from JSON file, exiting with a message if unreadable."""
+    try:
+        with open(config_path) as f:
+            return json.load(f)
+    except OSError as e:
+        log_error(f"Cannot read config file {config_path}: {e}")
+    except json.JSONDecodeError as e:
+        log_error(f"Invalid JSON in config file {config_path}: {e}")
+    sys.exit(1)
 
 
 def discover_org_repos(org: str) -> list[str]:
@@ -102,6 +233,14 @@ def discover_org_repos(org: str) -> list[str]:
     return sorted(repos)
 
 
+# Markers of sidebar sections on the repo homepage HTML, one named group per
+# section, so a single scan of the page finds every visible section
+_SIDEBAR_MARKERS = re.compile(
+    r"(?P<packages_visible>No packages published|>Packages\n)"
+    r"|(?P<environments_visible>No environments)"
+)
+
+
 def check_sidebar_sections(org: str, repo: str) -> dict:
     """Check which sections are visible on the repo homepage sidebar.
 
@@ -117,84 +256,138 @@ def check_sidebar_sections(org: str, repo: str) -> dict:
     if result.returncode != 0:
         return {"error": "Could not fetch repo page"}
 
-    html = result.stdout
-    return {
-        "packages_visible": "No packages published" in html or ">Packages\n" in html,
-        "environments_visible": "No environments" in html,
-    }
-
+    sections = dict.fromkeys(_SIDEBAR_MARKERS.groupindex, False)
+    for match in _SIDEBAR_MARKERS.finditer(result.stdout):
+        if match.lastgroup:
+            sections[match.lastgroup] = True
+        if all(sections.values()):
+            break
+    return sections
+
+
+# One GraphQL query answers every feature/merge setting plus Dependabot alerts;
+# the REST equivalent needs the repo object and a vulnerability-alerts probe.
+_REPO_STATE_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    hasIssuesEnabled hasWikiEnabled hasProjectsEnabled hasDiscussionsEnabled
+    squashMergeAllowed mergeCommitAllowed rebaseMergeAllowed
+    deleteBranchOnMerge autoMergeAllowed
+    squashMergeCommitTitle squashMergeCommitMessage
+    hasVulnerabilityAlertsEnabled
+  }
+}
+"""
 
-def get_current_settings(org: str, repo: str) -> dict | None:
-    """Fetch current repository settings from GitHub API."""
-    result = run_gh(
-        ["api", f"repos/{org}/{repo}"],
-        check=False,
+# (GraphQL field, settings category, REST/config setting name)
+_REPO_STATE_FIELDS = (
+    ("hasIssuesEnabled", "features", "has_issues"),
+    ("hasWikiEnabled", "features", "has_wiki"),
+    ("hasProjectsEnabled", "features", "has_projects"),
+    ("hasDiscussionsEnabled", "features", "has_discussions"),
+    ("squashMergeAllowed", "merge", "allow_squash_merge"),
+    ("mergeCommitAllowed", "merge", "allow_merge_commit"),
+    ("rebaseMergeAllowed", "merge", "allow_rebase_merge"),
+    ("deleteBranchOnMerge", "merge", "delete_branch_on_merge"),
+    ("autoMergeAllowed", "merge", "allow_auto_merge"),
+    ("squashMergeCommitTitle", "merge", "squash_merge_commit_title"),
+    ("squashMergeCommitMessage", "merge", "squash_merge_commit_message"),
+    ("hasVulnerabilityAlertsEnabled", "security", "dependabot_alerts"),
+)
+
+
+def fetch_repo_state(org: str, repo: str) -> dict | None:
+    """Fetch feature, merge and Dependabot-alert settings in one GraphQL query.
+
+    Returns {"features": ..., "merge": ..., "security": ...} keyed by the
+    REST/config setting names, or None if the repository could not be read.
+    """
+    result = gh_request(
+        "POST", "graphql",
+        {"query": _REPO_STATE_QUERY, "variables": {"owner": org, "name": repo}},
     )
-    if result.returncode != 0:
+    if not result.ok:
+        return None
+    try:
+        data = result.json()["data"]["repository"]
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return None
+    if not data:
         return None
 
-    data = json.loads(result.stdout)
-    return {
-        "features": {
-            "has_issues": data.get("has_issues"),
-            "has_wiki": data.get("has_wiki"),
-            "has_projects": data.get("has_projects"),
-            "has_discussions": data.get("has_discussions"),
-        },
-        "merge": {
-            "allow_squash_merge": data.get("allow_squash_merge"),
-            "allow_merge_commit": data.get("allow_merge_commit"),
-            "allow_rebase_merge": data.get("allow_rebase_merge"),
-            "delete_branch_on_merge": data.get("delete_branch_on_merge"),
-            "allow_auto_merge": data.get("allow_auto_merge"),
-            "squash_merge_commit_title": data.get("squash_merge_commit_title"),
-            "squash_merge_commit_message": data.get("squash_merge_commit_message"),
-        },
-    }
+    state: dict[str, dict] = {"features": {}, "merge": {}, "security": {}}
+    for field, category, setting in _REPO_STATE_FIELDS:
+        state[category][setting] = data.get(field)
+    return state
 
 
-def get_current_security_settings(org: str, repo: str) -> dict:
-    """Fetch current security settings from GitHub API."""
+def get_current_settings(org: str, repo: str) -> dict | None:
+    """Fetch current repository settings from GitHub.
+
+    Besides "features" and "merge", the result carries the "security"
+    values the same query answered, for get_current_security_settings.
+    """
+    return fetch_repo_state(org, repo)
+
+
+def repo_state_from_rest(repository: dict) -> dict:
+    """Build the "features"/"merge" state from a REST repository object.
+
+    The REST field names are the config's setting names. Used with the body a
+    settings PATCH returns, which already reflects the update.
+    """
+    state: dict = {"features": {}, "merge": {}}
+    for _, category, setting in _REPO_STATE_FIELDS:
+        if category in state:
+            state[category][setting] = repository.get(setting)
+    return state
+
+
+def get_current_security_settings(
+    org: str, repo: str, current: dict | None = None, repository: dict | None = None
+) -> dict:
+    """Fetch current security settings from GitHub API.
+
+    Values already present in current["security"] (see get_current_settings)
+    are reused instead of probed again, and secret scanning is read from
+    ``repository`` (an up-to-date REST repository object) when one is given.
+    """
+    known = (current or {}).get("security", {})
     security = {}
 
     # Private vulnerability reporting
-    result = run_gh(
-        ["api", f"repos/{org}/{repo}/private-vulnerability-reporting", "--jq", ".enabled"],
-        check=False,
-    )
-    security["private_vulnerability_reporting"] = result.stdout.strip() == "true" if result.returncode == 0 else None
+    result = gh_get(f"repos/{org}/{repo}/private-vulnerability-reporting")
+    security["private_vulnerability_reporting"] = result.json().get("enabled") is True if result.ok else None
 
     # Dependabot alerts
-    result = run_gh(
-        ["api", f"repos/{org}/{repo}/vulnerability-alerts"],
-        check=False,
-    )
-    security["dependabot_alerts"] = result.returncode == 204  # 204 means enabled
+    if known.get("dependabot_alerts") is not None:
+        security["dependabot_alerts"] = known["dependabot_alerts"]
+    else:
+        result = gh_get(f"repos/{org}/{repo}/vulnerability-alerts")
+        security["dependabot_alerts"] = result.status == 204  # 204 enabled, 404 disabled
 
     # Dependabot security updates
-    result = run_gh(
-        ["api", f"repos/{org}/{repo}/automated-security-fixes"],
-        check=False,
-    )
-    if result.returncode == 0:
-        data = json.loads(result.stdout) if result.stdout else {}
+    result = gh_get(f"repos/{org}/{repo}/automated-security-fixes")
+    if result.ok:
+        data = result.json() if result.body else {}
         security["dependabot_security_updates"] = data.get("enabled", False)
     else:
         security["dependabot_security_updates"] = None
 
     # Secret scanning (from repo settings)
-    result = run_gh(
-        ["api", f"repos/{org}/{repo}", "--jq", ".security_and_analysis"],
-        check=False,
-    )
-    if result.returncode == 0 and result.stdout.strip():
-        try:
-            sa_data = json.loads(result.stdout)
-            security["secret_scanning"] = sa_data.get("secret_scanning", {}).get("status") == "enabled"
-            security["secret_scanning_push_protection"] = sa_data.get("secret_scanning_push_protection", {}).get("status") == "enabled"
-        except json.JSONDecodeError:
-            security["secret_scanning"] = None
-            security["secret_scanning_push_protection"] = None
+    sa_data = None
+    if repository is not None:
+        sa_data = repository.get("security_and_analysis")
+    else:
+        result = gh_get(f"repos/{org}/{repo}")
+        if result.ok:
+            try:
+                sa_data = result.json().get("security_and_analysis")
+            except json.JSONDecodeError:
+                pass
+    if isinstance(sa_data, dict):
+        security["secret_scanning"] = sa_data.get("secret_scanning", {}).get("status") == "enabled"
+        security["secret_scanning_push_protection"] = sa_data.get("secret_scanning_push_protection", {}).get("status") == "enabled"
     else:
         security["secret_scanning"] = None
         security["secret_scanning_push_protection"] = None
@@ -202,52 +395,81 @@ def get_current_security_settings(org: str, repo: str) -> dict:
     return security
 
 
-def compute_diff(org: str, repo: str, config: dict) -> dict:
-    """Compute diff between current and desired settings."""
+def diff_cache_path(org: str, repo: str, config: dict) -> Path:
+    """Location of the cached diff for this repository and exact config."""
+    digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+    return DIFF_CACHE_DIR / org / repo / f"{digest}.json"
+
+
+def invalidate_diff_cache(org: str, repo: str) -> None:
+    """Drop cached diffs of a repository whose settings were just written."""
+    for path in (DIFF_CACHE_DIR / org / repo).glob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+# Setting categories compared against the current state, in report order
+SETTING_CATEGORIES = ("features", "merge", "security")
+
+
+def desired_settings(config: dict) -> tuple[tuple[str, str, Any], ...]:
+    """Flatten the config into (category, setting, desired value) records.
+
+    Batch runs build this once and share it across every repository.
+    """
+    return tuple(
+        (category, key, value)
+        for category in SETTING_CATEGORIES
+        for key, value in config[category].items()
+    )
+
+
+def compute_diff(org: str, repo: str, config: dict, use_cache: bool = False) -> dict:
+    """Compute diff between current and desired settings.
+
+    With use_cache, a diff computed for the same repository and config less
+    than DIFF_CACHE_TTL seconds ago is returned without any API calls.
+    """
+    cache_path = diff_cache_path(org, repo, config) if use_cache else None
+    if cache_path is not None:
+        try:
+            if time.time() - cache_path.stat().st_mtime < DIFF_CACHE_TTL:
+                return _json_loads(cache_path.read_bytes())
+        except (OSError, ValueError):
+            pass
+
+    diff = _build_diff(org, repo, config)
+
+    if cache_path is not None and "error" not in diff:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(diff))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    return diff
+
+
+def _build_diff(org: str, repo: str, config: dict) -> dict:
+    """Fetch current settings and compare them with the config."""
     current = get_current_settings(org, repo)
-    current_security = get_current_security_settings(org, repo)
+    current_security = get_current_security_settings(org, repo, current)
 
     if current is None:
         return {"error": f"Could not fetch settings for {org}/{repo}"}
 
-    desired_features = config["features"]
-    desired_merge = config["merge"]
-    desired_security = config["security"]
-
     changes: list[dict] = []
     diff: dict = {
         "repository": f"{org}/{repo}",
         "changes": changes,
     }
 
-    # Compare features
-    for key, desired_value in desired_features.items():
-        current_value = current["features"].get(key)
-        if current_value != desired_value:
-            changes.append({
-                "category": "features",
-                "setting": key,
-                "current": current_value,
-                "desired": desired_value,
-            })
-
-    # Compare merge settings
-    for key, desired_value in desired_merge.items():
-        current_value = current["merge"].get(key)
+    actual_by_category = {"features": current["features"], "merge": current["merge"], "security": current_security}
+    for category, key, desired_value in desired_settings(config):
+        current_value = actual_by_category[category].get(key)
         if current_value != desired_value:
             changes.append({
-                "category": "merge",
-                "setting": key,
-                "current": current_value,
-                "desired": desired_value,
-            })
-
-    # Compare security settings
-    for key, desired_value in desired_security.items():
-        current_value = current_security.get(key)
-        if current_value != desired_value:
-            changes.append({
-                "category": "security",
+                "category": category,
                 "setting": key,
                 "current": current_value,
                 "desired": desired_value,
@@ -285,35 +507,33 @@ def compute_diff(org: str, repo: str, config: dict) -> dict:
     return diff
 
 
-def apply_repo_settings(org: str, repo: str, config: dict) -> None:
-    """Apply repository feature and merge settings."""
-    log_section(f"Configuring {org}/{repo}")
+def apply_repo_settings(org: str, repo: str, config: dict) -> dict | None:
+    """Apply repository feature and merge settings.
 
-    features = config["features"]
-    merge = config["merge"]
+    Returns the updated repository object GitHub answers the PATCH with, or
+    None if the update failed.
+    """
+    log_section(f"Configuring {org}/{repo}")
 
     log_info("Applying repository settings...")
 
-    args = [
-        "api", "-X", "PATCH", f"repos/{org}/{repo}",
-        "-F", f"has_issues={str(features['has_issues']).lower()}",
-        "-F", f"has_wiki={str(features['has_wiki']).lower()}",
-        "-F", f"has_projects={str(features['has_projects']).lower()}",
-        "-F", f"has_discussions={str(features['has_discussions']).lower()}",
-        "-F", f"allow_squash_merge={str(merge['allow_squash_merge']).lower()}",
-        "-F", f"allow_merge_commit={str(merge['allow_merge_commit']).lower()}",
-        "-F", f"allow_rebase_merge={str(merge['allow_rebase_merge']).lower()}",
-        "-F", f"delete_branch_on_merge={str(merge['delete_branch_on_merge']).lower()}",
-        "-F", f"allow_auto_merge={str(merge['allow_auto_merge']).lower()}",
-        "-f", f"squash_merge_commit_title={merge['squash_merge_commit_title']}",
-        "-f", f"squash_merge_commit_message={merge['squash_merge_commit_message']}",
-    ]
+    # Same fields the state query reads back, so apply and diff cannot drift apart
+    body = {
+        setting: config[category][setting]
+        for _, category, setting in _REPO_STATE_FIELDS
+        if category != "security"
+    }
 
-    result = run_gh(args, check=False)
-    if result.returncode == 0:
-        log_info("  ✓ Repository settings applied")
-    else:
+    result = gh_request("PATCH", f"repos/{org}/{repo}", body)
+    if not result.ok:
         log_warn("  ⚠ Some settings may require admin access")
+        return None
+    log_info("  ✓ Repository settings applied")
+    try:
+        repository = result.json()
+    except json.JSONDecodeError:
+        return None
+    return repository if isinstance(repository, dict) else None
 
 
 def apply_labels(org: str, repo: str, config: dict) -> None:
@@ -343,83 +563,119 @@ def apply_labels(org: str, repo: str, config: dict) -> None:
             log_warn(f"  ⚠ Label '{label['name']}' failed: {result.stderr.strip()}")
 
 
-def apply_security_settings(org: str, repo: str, config: dict) -> None:
-    """Apply security settings."""
+# Log lines per security setting: (applied, failed)
+_SECURITY_MESSAGES = {
+    "private_vulnerability_reporting": ("Private vulnerability reporting enabled", "Could not enable vulnerability reporting"),
+    "dependabot_alerts": ("Dependabot alerts enabled", "Could not enable Dependabot alerts"),
+    "dependabot_security_updates": ("Dependabot security updates enabled", "Could not enable Dependabot updates"),
+    "secret_scanning": ("Secret scanning enabled", "Secret scanning may require GHAS"),
+    "secret_scanning_push_protection": ("Push protection enabled", "Push protection may require GHAS"),
+}
+
+
+@lru_cache(maxsize=1)
+def _security_pool() -> ThreadPoolExecutor:
+    """Shared pool for security writes; long-lived threads keep their connections."""
+    return ThreadPoolExecutor(max_workers=MAX_BATCH_WORKERS, thread_name_prefix="security")
+
+
+def shutdown_security_pool() -> None:
+    """Stop the security pool's threads, if the pool was ever started."""
+    if _security_pool.cache_info().currsize:
+        _security_pool().shutdown()
+        _security_pool.cache_clear()
+
+
+def apply_security_settings(org: str, repo: str, config: dict) -> dict | None:
+    """Apply security settings.
+
+    The independent writes run concurrently; their log lines and results are
+    emitted afterwards in the calling thread, so batch log capture sees them.
+    Returns the repository object GitHub answers the security_and_analysis
+    PATCH with, or None if that PATCH was not sent or failed.
+    """
     security = config["security"]
 
     log_info("Applying security settings...")
 
-    # Private vulnerability reporting
-    if security.get("private_vulnerability_reporting"):
-        result = run_gh(
-            ["api", "-X", "PUT", f"repos/{org}/{repo}/private-vulnerability-reporting"],
-            check=False,
-        )
-        if result.returncode == 0:
-            log_info("  ✓ Private vulnerability reporting enabled")
-        else:
-            log_warn("  ⚠ Could not enable vulnerability reporting")
+    def enable(endpoint: str) -> ApiResponse:
+        return gh_request("PUT", f"repos/{org}/{repo}/{endpoint}")
+
+    def dependabot() -> list[tuple[str, ApiResponse]]:
+        # Security updates are rejected until alerts are enabled, so these two stay in order
+        results = []
+        if security.get("dependabot_alerts"):
+            results.append(("dependabot_alerts", enable("vulnerability-alerts")))
+        if security.get("dependabot_security_updates"):
+            results.append(("dependabot_security_updates", enable("automated-security-fixes")))
+        return results
+
+    # Secret scanning and push protection share one security_and_analysis PATCH
+    analysis = {
+        key: {"status": "enabled"}
+        for key in ("secret_scanning", "secret_scanning_push_protection")
+        if security.get(key)
+    }
 
-    # Dependabot alerts
-    if security.get("dependabot_alerts"):
-        result = run_gh(
-            ["api", "-X", "PUT", f"repos/{org}/{repo}/vulnerability-alerts"],
-            check=False,
-        )
-        if result.returncode == 0:
-            log_info("  ✓ Dependabot alerts enabled")
-        else:
-            log_warn("  ⚠ Could not enable Dependabot alerts")
+    def secret_scanning() -> list[tuple[str, ApiResponse]]:
+        if not analysis:
+            return []
+        result = gh_request("PATCH", f"repos/{org}/{repo}", {"security_and_analysis": analysis})
+        if len(analysis) == 1 or not 400 <= result.status < 500:
+            return [(key, result) for key in analysis]
+        # GitHub rejects the whole body if either setting is unavailable (e.g. push
+        # protection without GHAS); send them one by one so the other still applies
+        return [
+            (key, gh_request("PATCH", f"repos/{org}/{repo}", {"security_and_analysis": {key: value}}))
+            for key, value in analysis.items()
+        ]
 
-    # Dependabot security updates
-    if security.get("dependabot_security_updates"):
-        result = run_gh(
-            ["api", "-X", "PUT", f"repos/{org}/{repo}/automated-security-fixes"],
-            check=False,
-        )
-        if result.returncode == 0:
-            log_info("  ✓ Dependabot security updates enabled")
-        else:
-            log_warn("  ⚠ Could not enable Dependabot updates")
-
-    # Secret scanning
-    if security.get("secret_scanning"):
-        result = run_gh(
-            [
-                "api", "-X", "PATCH", f"repos/{org}/{repo}",
-                "--field", 'security_and_analysis={"secret_scanning":{"status":"enabled"}}',
-            ],
-            check=False,
-        )
-        if result.returncode == 0:
-            log_info("  ✓ Secret scanning enabled")
-        else:
-            log_warn("  ⚠ Secret scanning may require GHAS")
-
-    # Secret scanning push protection
-    if security.get("secret_scanning_push_protection"):
-        result = run_gh(
-            [
-                "api", "-X", "PATCH", f"repos/{org}/{repo}",
-                "--field", 'security_and_analysis={"secret_scanning_push_protection":{"status":"enabled"}}',
-            ],
-            check=False,
-        )
-        if result.returncode == 0:
-            log_info("  ✓ Push protection enabled")
-        else:
-            log_warn("  ⚠ Push protection may require GHAS")
+    def vulnerability_reporting() -> list[tuple[str, ApiResponse]]:
+        if not security.get("private_vulnerability_reporting"):
+            return []
+        return [("private_vulnerability_reporting", enable("private-vulnerability-reporting"))]
 
+    # Each task captures its own log lines (e.g. rate-limit warnings from github_api.send);
+    # they are replayed here so they land in the caller's capture, in order
+    pool = _security_pool()
+    futures = [
+        pool.submit(run_captured, task) for task in (vulnerability_reporting, dependabot, secret_scanning)
+    ]
 
-def verify_settings(org: str, repo: str, config: dict) -> bool:
+    repository = None
+    for future in futures:
+        results, lines = future.result()
+        for line in lines:
+            _emit(line)
+        for key, result in results:
+            applied, failed = _SECURITY_MESSAGES[key]
+            if result.ok:
+                log_info(f"  ✓ {applied}")
+            else:
+                log_warn(f"  ⚠ {failed}")
+            if key in analysis and result.ok and repository is None:
+                try:
+                    repository = result.json()
+                except json.JSONDecodeError:
+                    pass
+    return repository if isinstance(repository, dict) else None
+
+
+def verify_settings(
+    org: str, repo: str, config: dict, desired: tuple | None = None, prefetched: dict | None = None
+) -> bool:
     """Verify applied settings match the desired configuration.
 
+    ``desired`` is the precomputed desired_settings(config), if available.
+    ``prefetched`` is the latest repository object returned by an apply PATCH;
+    when given, features, merge and secret scanning settings are checked
+    against it instead of being fetched again.
     Returns True if all settings match, False otherwise.
     """
     log_info("Verifying settings...")
 
-    current = get_current_settings(org, repo)
-    current_security = get_current_security_settings(org, repo)
+    current = repo_state_from_rest(prefetched) if prefetched else get_current_settings(org, repo)
+    current_security = get_current_security_settings(org, repo, current, prefetched)
 
     if current is None:
         log_error("  Could not fetch settings for verification")
@@ -427,33 +683,16 @@ def verify_settings(org: str, repo: str, config: dict) -> bool:
 
     all_passed = True
 
-    # Verify features
-    for key, desired in config["features"].items():
-        actual = current["features"].get(key)
-        if actual == desired:
-            log_info(f"  ✓ {key}: {actual}")
-        else:
-            log_error(f"  ✗ {key}: expected {desired}, got {actual}")
-            all_passed = False
-
-    # Verify merge settings
-    for key, desired in config["merge"].items():
-        actual = current["merge"].get(key)
-        if actual == desired:
-            log_info(f"  ✓ {key}: {actual}")
-        else:
-            log_error(f"  ✗ {key}: expected {desired}, got {actual}")
-            all_passed = False
-
-    # Verify security settings (some may not be verifiable due to permissions)
-    for key, desired in config["security"].items():
-        actual = current_security.get(key)
-        if actual is None:
+    # Security settings may not be verifiable due to permissions (None)
+    actual_by_category = {"features": current["features"], "merge": current["merge"], "security": current_security}
+    for category, key, desired_value in desired or desired_settings(config):
+        actual = actual_by_category[category].get(key)
+        if actual is None and category == "security":
             log_warn(f"  ? {key}: could not verify (may require elevated permissions)")
-        elif actual == desired:
+        elif actual == desired_value:
             log_info(f"  ✓ {key}: {actual}")
         else:
-            log_error(f"  ✗ {key}: expected {desired}, got {actual}")
+            log_error(f"  ✗ {key}: expected {desired_value}, got {actual}")
             all_passed = False
 
     # Verify labels. A missing automerge label silently disables Dependabot
@@ -556,13 +795,25 @@ Examples:
         action="store_true",
         help="Apply changes (required when using --repo)",
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="With --diff: reuse a diff cached by a run in the last five minutes",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     """Main entry point."""
     args = parse_args()
+    try:
+        run_mode(args)
+    finally:
+        shutdown_security_pool()
+
 
+def run_mode(args: argparse.Namespace) -> None:
+    """Run the mode selected by the command line arguments."""
     # Validate argument combinations
     if args.repo and not (args.diff or args.apply):
         log_error("When using --repo, you must specify either --diff or --apply")
@@ -572,9 +823,7 @@ def main() -> None:
         log_error("Cannot use --diff and --apply together")
         sys.exit(1)
 
-    check_dependencies()
-
-    # Determine config file path
+    # Determine config file path; a bad config fails before any gh probe
     script_dir = Path(__file__).parent
     if args.config:
         config_path = Path(args.config)
@@ -584,18 +833,23 @@ def main() -> None:
     config = load_config(config_path)
     org = config["organization"]
 
+    check_dependencies()
+    load_etag_cache()
+    atexit.register(save_etag_cache)
+
     # Single repo diff mode
     if args.repo and args.diff:
-        diff = compute_diff(org, args.repo, config)
+        diff = compute_diff(org, args.repo, config, use_cache=args.cache)
         print(json.dumps(diff, indent=2))
         return
 
     # Single repo apply mode
     if args.repo and args.apply:
-        apply_repo_settings(org, args.repo, config)
+        invalidate_diff_cache(org, args.repo)
+        patched = apply_repo_settings(org, args.repo, config)
         apply_labels(org, args.repo, config)
-        apply_security_settings(org, args.repo, config)
-        if not verify_settings(org, args.repo, config):
+        patched = apply_security_settings(org, args.repo, config) or patched
+        if not verify_settings(org, args.repo, config, prefetched=patched):
             log_error("Verification failed: some settings were not applied correctly")
             sys.exit(1)
         return
@@ -625,15 +879,27 @@ def main() -> None:
         log_error(f"No repositories to process for organization {org}")
         sys.exit(1)
 
-    # Process each repository
-    failed_repos: list[str] = []
-    for repo in repositories:
-        apply_repo_settings(org, repo, config)
+    # Process repositories concurrently; each one's log is replayed as a block
+    # in input order, so the output reads the same as a sequential run.
+    desired = desired_settings(config)
+
+    def process_repo(repo: str) -> bool:
+        invalidate_diff_cache(org, repo)
+        patched = apply_repo_settings(org, repo, config)
         apply_labels(org, repo, config)
-        apply_security_settings(org, repo, config)
-        if not verify_settings(org, repo, config):
-            failed_repos.append(repo)
-        print(file=sys.stderr)
+        # The later PATCH response is the current repository state
+        patched = apply_security_settings(org, repo, config) or patched
+        return verify_settings(org, repo, config, desired, prefetched=patched)
+
+    failed_repos: list[str] = []
+    with ThreadPoolExecutor(max_workers=min(MAX_BATCH_WORKERS, len(repositories))) as pool:
+        outcomes = pool.map(lambda repo: run_captured(process_repo, repo), repositories)
+        for repo, (ok, lines) in zip(repositories, outcomes, strict=True):
+            for line in lines:
+                print(line, file=sys.stderr)
+            print(file=sys.stderr)
+            if not ok:
+                failed_repos.append(repo)
 
     if failed_repos:
         log_error(f"Verification failed for {len(failed_repos)} repository(ies): {', '.join(failed_repos)}")
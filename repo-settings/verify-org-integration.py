@@ -5,7 +5,10 @@ Identifies and removes:
 - Repo-level secrets that should be org-level
 - Duplicate community health files (inherited from cuioss/.github)
 
-Requires: gh cli (https://cli.github.com/)
+Requires: gh cli (https://cli.github.com/), used for the auth check and the
+token. API calls go directly to api.github.com over a keep-alive HTTPS
+connection per thread; GH_TOKEN or GITHUB_TOKEN, when set, is used instead of
+`gh auth token`.
 
 Usage:
     ./verify-org-integration.py --repo cui-java-tools --diff   # Show issues as JSON
@@ -18,10 +21,15 @@ import json
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from pathlib import Path
 
+import github_api
+from github_api import request as gh_request
+
 # Constants - secrets that should be at org level, not repo level
-ORG_LEVEL_SECRETS = [
+ORG_LEVEL_SECRETS = frozenset({
     "GPG_PRIVATE_KEY",
     "GPG_PASSPHRASE",
     "OSS_SONATYPE_USERNAME",
@@ -29,20 +37,26 @@ ORG_LEVEL_SECRETS = [
     "RELEASE_APP_ID",
     "RELEASE_APP_PRIVATE_KEY",
     "SONAR_TOKEN",
-]
+})
 
 # Secrets that are expected at repo level (none - all secrets are org-level)
-REPO_LEVEL_SECRETS: list[str] = []
+REPO_LEVEL_SECRETS: frozenset[str] = frozenset()
 
 # Community health files that are inherited from cuioss/.github
-ORG_COMMUNITY_FILES = [
+ORG_COMMUNITY_FILES = (
     "CODE_OF_CONDUCT.md",
     "CONTRIBUTING.md",
     "SECURITY.md",
-]
+)
 
 ORG = "cuioss"
 
+# Secret deletions are independent API calls and run this many at a time
+DELETE_WORKERS = 8
+
+# Largest page the secrets listing accepts
+SECRETS_PAGE_SIZE = 100
+
 # ANSI colors
 GREEN = "\033[0;32m"
 YELLOW = "\033[1;33m"
@@ -69,14 +83,7 @@ def log_section(msg: str) -> None:
     print(f"\n{BLUE}=== {msg} ==={NC}", file=sys.stderr)
 
 
-def run_gh(args: list[str], check: bool = True) -> subprocess.CompletedProcess[str]:
-    """Run gh command and return result."""
-    return subprocess.run(
-        ["gh"] + args,
-        capture_output=True,
-        text=True,
-        check=check,
-    )
+github_api.warn = log_warn
 
 
 def check_dependencies() -> None:
@@ -94,32 +101,46 @@ def check_dependencies() -> None:
 
 
 def get_repo_secrets(org: str, repo: str) -> list[dict]:
-    """Fetch repository-level secrets (names only, not values)."""
-    result = run_gh(
-        ["api", f"repos/{org}/{repo}/actions/secrets"],
-        check=False,
-    )
-    if result.returncode != 0:
-        return []
+    """Fetch repository-level secrets (names only, not values).
+
+    Pages of SECRETS_PAGE_SIZE are requested until total_count is reached;
+    the API default of 30 per page would silently truncate larger listings.
+    """
+    secrets: list[dict] = []
+    page = 1
+    while True:
+        result = gh_request(
+            "GET", f"repos/{org}/{repo}/actions/secrets?per_page={SECRETS_PAGE_SIZE}&page={page}"
+        )
+        if not result.ok:
+            return secrets
 
-    data = json.loads(result.stdout)
-    return data.get("secrets", [])
+        data = result.json()
+        batch = data.get("secrets", [])
+        secrets.extend(batch)
+        if not batch or len(secrets) >= data.get("total_count", 0):
+            return secrets
+        page += 1
 
 
 def delete_repo_secret(org: str, repo: str, name: str) -> bool:
     """Delete a repository-level secret."""
-    result = run_gh(
-        ["api", "--method", "DELETE", f"repos/{org}/{repo}/actions/secrets/{name}"],
-        check=False,
-    )
-    return result.returncode == 0
+    return gh_request("DELETE", f"repos/{org}/{repo}/actions/secrets/{name}").ok
+
+
+@cache
+def remaining_secret_names(org: str, repo: str) -> frozenset[str]:
+    """Names of the repository's secrets, fetched once until cache_clear()."""
+    return frozenset(s["name"] for s in get_repo_secrets(org, repo))
 
 
 def verify_secret_deleted(org: str, repo: str, name: str) -> bool:
-    """Verify a secret has been deleted by re-checking the API."""
-    secrets = get_repo_secrets(org, repo)
-    secret_names = [s["name"] for s in secrets]
-    return name not in secret_names
+    """Verify a secret is absent from the repository's secret listing.
+
+    The listing is fetched once and shared by all checks, so call
+    remaining_secret_names.cache_clear() after deleting to read it afresh.
+    """
+    return name not in remaining_secret_names(org, repo)
 
 
 def check_duplicate_files(local_path: Path | None) -> list[str]:
@@ -127,23 +148,28 @@ def check_duplicate_files(local_path: Path | None) -> list[str]:
     if local_path is None:
         return []
 
-    duplicates = []
-    for filename in ORG_COMMUNITY_FILES:
-        file_path = local_path / filename
-        if file_path.exists():
-            duplicates.append(filename)
+    # One directory listing instead of a stat per candidate file
+    try:
+        with os.scandir(local_path) as entries:
+            present = {entry.name for entry in entries}
+    except OSError:
+        return []
 
-    return duplicates
+    return [filename for filename in ORG_COMMUNITY_FILES if filename in present]
 
 
 def remove_duplicate_files(local_path: Path, files: list[str]) -> list[str]:
     """Remove duplicate community health files from local repo."""
     removed = []
     for filename in files:
-        file_path = local_path / filename
-        if file_path.exists():
-            os.remove(file_path)
-            removed.append(filename)
+        try:
+            os.unlink(local_path / filename)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            log_error(f"Failed to remove {filename}: {e}")
+            continue
+        removed.append(filename)
     return removed
 
 
@@ -158,11 +184,14 @@ def compute_diff(org: str, repo: str, local_path: Path | None) -> dict:
     secrets = get_repo_secrets(org, repo)
     secret_names = [s["name"] for s in secrets]
 
-    # Identify secrets that should be org-level
-    should_be_org_level = [name for name in secret_names if name in ORG_LEVEL_SECRETS]
-
-    # Identify expected repo-level secrets
-    expected_repo_level = [name for name in secret_names if name in REPO_LEVEL_SECRETS]
+    # Classify secrets in one pass: should be org-level, or expected at repo level
+    should_be_org_level = []
+    expected_repo_level = []
+    for name in secret_names:
+        if name in ORG_LEVEL_SECRETS:
+            should_be_org_level.append(name)
+        elif name in REPO_LEVEL_SECRETS:
+            expected_repo_level.append(name)
 
     # Check for duplicate community files
     duplicate_files = check_duplicate_files(local_path)
@@ -215,8 +244,11 @@ def apply_fixes(
     # Delete secrets if specified
     if secrets_to_delete:
         log_info("Deleting repo-level secrets that should be org-level...")
-        for name in secrets_to_delete:
-            if delete_repo_secret(org, repo, name):
+        with ThreadPoolExecutor(max_workers=min(DELETE_WORKERS, len(secrets_to_delete))) as pool:
+            deleted = list(pool.map(lambda name: delete_repo_secret(org, repo, name), secrets_to_delete))
+        # Results are reported in request order, independent of completion order
+        for name, ok in zip(secrets_to_delete, deleted, strict=True):
+            if ok:
                 log_info(f"  Deleted: {name}")
                 result["secrets_deleted"].append(name)
             else:
@@ -234,7 +266,8 @@ def apply_fixes(
     # Verification
     log_info("Verifying changes...")
 
-    # Verify secrets deleted
+    # Verify secrets deleted against one listing taken after the deletions
+    remaining_secret_names.cache_clear()
     for name in result["secrets_deleted"]:
         if verify_secret_deleted(org, repo, name):
             log_info(f"  ✓ {name} verified deleted")
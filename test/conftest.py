@@ -1,12 +1,24 @@
 """Shared test fixtures for cuioss-organization Python scripts."""
 
+import importlib.util
+import io
+import os
 import subprocess
 import sys
 from collections import namedtuple
+from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
+from types import ModuleType
+from unittest.mock import patch
 
 import pytest
 
+# Prefer orjson for parsing the production configs when installed
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads  # type: ignore[assignment]
+
 PROJECT_ROOT = Path(__file__).parent.parent
 ScriptResult = namedtuple("ScriptResult", ["returncode", "stdout", "stderr"])
 
@@ -35,13 +47,90 @@ def run_script(script_path: Path, *args, cwd=None, input_data=None, env=None):
     return ScriptResult(result.returncode, result.stdout, result.stderr)
 
 
+_SCRIPT_MODULES: dict[Path, ModuleType] = {}
+
+
+def load_script(script_path: Path) -> ModuleType:
+    """Import a script as a module, once per test session."""
+    module = _SCRIPT_MODULES.get(script_path)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(script_path.stem.replace("-", "_"), script_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _SCRIPT_MODULES[script_path] = module
+    return module
+
+
+def call_main(script_path: Path, *args):
+    """Run a script's main() in this process and capture its exit and output.
+
+    Avoids an interpreter start per test, but shares the module between
+    calls: use it only where main() keeps no state across runs, such as
+    argument validation or a script that works purely from its arguments.
+    Everything else goes through run_script.
+
+    Returns:
+        ScriptResult with returncode, stdout, stderr
+    """
+    module = load_script(script_path)
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with patch.object(sys, "argv", [str(script_path), *map(str, args)]), \
+            redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            returned = module.main()
+            returncode = returned if isinstance(returned, int) else 0
+        except SystemExit as exc:
+            if exc.code is None or isinstance(exc.code, int):
+                returncode = exc.code or 0
+            else:
+                print(exc.code, file=sys.stderr)
+                returncode = 1
+    return ScriptResult(returncode, stdout.getvalue(), stderr.getvalue())
+
+
 @pytest.fixture
 def temp_dir(tmp_path):
     """Provide a temporary directory for test files."""
     return tmp_path
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache_home(tmp_path_factory):
+    """Point XDG_CACHE_HOME at a per-session directory.
+
+    Scripts keep stamps and response caches there. Isolating it keeps runs
+    from reading the developer's real cache and keeps parallel (xdist)
+    workers from writing the same files; subprocesses inherit it.
+    """
+    cache_home = tmp_path_factory.mktemp("xdg-cache")
+    previous = os.environ.get("XDG_CACHE_HOME")
+    os.environ["XDG_CACHE_HOME"] = str(cache_home)
+    yield cache_home
+    if previous is None:
+        del os.environ["XDG_CACHE_HOME"]
+    else:
+        os.environ["XDG_CACHE_HOME"] = previous
+
+
 @pytest.fixture
 def project_root():
     """Provide the project root path."""
     return PROJECT_ROOT
+
+
+@pytest.fixture(scope="session")
+def branch_protection_config():
+    """The production branch-protection/config.json, parsed once per session.
+
+    Shared across tests: read from it, never modify it.
+    """
+    return _json_loads((PROJECT_ROOT / "branch-protection/config.json").read_bytes())
+
+
+@pytest.fixture(scope="session")
+def repo_settings_config():
+    """The production repo-settings/config.json, parsed once per session.
+
+    Shared across tests: read from it, never modify it.
+    """
+    return _json_loads((PROJECT_ROOT / "repo-settings/config.json").read_bytes())
@@ -0,0 +1,117 @@
+"""Tests for github_api.py - the GitHub REST client shared by the admin scripts."""
+
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from conftest import PROJECT_ROOT
+
+# Add repo-settings to path so we can import the module directly
+sys.path.insert(0, str(PROJECT_ROOT / "repo-settings"))
+
+import github_api as api
+from github_api import ApiResponse
+
+
+@pytest.fixture
+def transmit():
+    """Patch the token lookup and the wire; yields the transmit mock."""
+    with patch.object(api, "gh_token", return_value="t"), patch.object(api, "transmit") as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def rate_state(monkeypatch):
+    """Start every test with no recorded rate-limit budget."""
+    state = {"remaining": None, "reset": 0.0}
+    monkeypatch.setattr(api, "_rate_state", state)
+    return state
+
+
+@pytest.fixture
+def sleep():
+    with patch.object(api.time, "sleep") as mock:
+        yield mock
+
+
+class TestApiResponse:
+    """Test the response tuple."""
+
+    def test_ok_covers_2xx_only(self):
+        assert ApiResponse(204, "").ok
+        assert not ApiResponse(304, "").ok
+        assert not ApiResponse(0, "connection refused").ok
+
+    def test_json_parses_body(self):
+        assert ApiResponse(200, '{"id": 1}').json() == {"id": 1}
+
+
+class TestRateLimitBackoff:
+    """Throttled requests are retried with exponential backoff."""
+
+    def test_secondary_limit_backs_off_exponentially(self, transmit, sleep):
+        throttled = (ApiResponse(403, '{"message": "You have exceeded a secondary rate limit"}'), {})
+        transmit.side_effect = [throttled, throttled, (ApiResponse(200, "{}"), {})]
+        assert api.send("PATCH", "repos/cuioss/r", b"{}").ok
+        assert transmit.call_count == 3
+        assert [call[0][0] for call in sleep.call_args_list] == [2.0, 4.0]
+
+    def test_retry_after_is_honoured(self, transmit, sleep):
+        transmit.side_effect = [(ApiResponse(429, ""), {"retry-after": "7"}), (ApiResponse(200, "{}"), {})]
+        assert api.send("GET", "repos/cuioss/r").ok
+        sleep.assert_called_once_with(7.0)
+
+    def test_gives_up_after_retry_budget(self, transmit, sleep):
+        transmit.return_value = (ApiResponse(429, ""), {})
+        assert api.send("GET", "repos/cuioss/r").status == 429
+        assert transmit.call_count == api.RATE_LIMIT_RETRIES + 1
+
+    def test_permission_error_is_not_retried(self, transmit, sleep):
+        transmit.return_value = (ApiResponse(403, '{"message": "Resource not accessible by integration"}'), {})
+        assert api.send("PUT", "repos/cuioss/r/vulnerability-alerts").status == 403
+        assert transmit.call_count == 1
+        sleep.assert_not_called()
+
+    def test_retry_warning_goes_to_the_scripts_logger(self, transmit, sleep, monkeypatch):
+        warnings = []
+        monkeypatch.setattr(api, "warn", warnings.append)
+        transmit.side_effect = [(ApiResponse(429, ""), {"retry-after": "1"}), (ApiResponse(204, ""), {})]
+        api.send("DELETE", "repos/cuioss/r/actions/secrets/X")
+        assert warnings == ["Rate limited on DELETE /repos/cuioss/r/actions/secrets/X; retrying in 1s"]
+
+
+class TestRateLimitPacing:
+    """Requests slow down before the primary budget runs out."""
+
+    def test_budget_is_recorded_from_headers(self, transmit, sleep, rate_state):
+        transmit.return_value = (ApiResponse(200, "[]"), {"x-ratelimit-remaining": "4000", "x-ratelimit-reset": "0"})
+        api.send("GET", "repos/cuioss/r/rulesets")
+        assert rate_state["remaining"] == 4000
+        sleep.assert_not_called()
+
+    def test_low_budget_waits_for_reset(self, transmit, sleep, rate_state):
+        rate_state.update(remaining=api.RATE_LIMIT_FLOOR - 1, reset=api.time.time() + 30)
+        transmit.return_value = (ApiResponse(200, "[]"), {})
+        api.send("GET", "repos/cuioss/r/rulesets")
+        assert 29 <= sleep.call_args[0][0] <= 31
+
+    def test_budget_at_floor_does_not_wait(self, transmit, sleep, rate_state):
+        rate_state.update(remaining=api.RATE_LIMIT_FLOOR, reset=api.time.time() + 30)
+        transmit.return_value = (ApiResponse(200, "[]"), {})
+        api.send("GET", "repos/cuioss/r/rulesets")
+        sleep.assert_not_called()
+
+
+class TestRequest:
+    """Test JSON request encoding."""
+
+    def test_body_is_sent_as_json(self):
+        with patch.object(api, "send", return_value=ApiResponse(200, "{}")) as send:
+            api.request("PATCH", "repos/cuioss/r", {"has_wiki": False})
+        send.assert_called_once_with("PATCH", "repos/cuioss/r", b'{"has_wiki": false}')
+
+    def test_no_body_sends_no_payload(self):
+        with patch.object(api, "send", return_value=ApiResponse(204, "")) as send:
+            api.request("DELETE", "repos/cuioss/r/actions/secrets/X")
+        send.assert_called_once_with("DELETE", "repos/cuioss/r/actions/secrets/X", None)
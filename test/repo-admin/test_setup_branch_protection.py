@@ -5,12 +5,15 @@ Actual GitHub API calls are not tested here as they require authentication.
 """
 
 import json
-import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest.mock import patch
 
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from conftest import PROJECT_ROOT, run_script
+import pytest
+
+from conftest import PROJECT_ROOT, call_main, run_script
 
 SCRIPT_PATH = PROJECT_ROOT / "branch-protection/setup-branch-protection.py"
 CONFIG_PATH = PROJECT_ROOT / "branch-protection/config.json"
@@ -45,7 +48,7 @@ class TestArgumentValidation:
             },
         }))
 
-        result = run_script(SCRIPT_PATH, config, "--repo", "test-repo")
+        result = call_main(SCRIPT_PATH, config, "--repo", "test-repo")
         assert result.returncode != 0
         assert "must specify" in result.stderr.lower() or "--diff" in result.stderr
 
@@ -75,20 +78,25 @@ class TestArgumentValidation:
             },
         }))
 
-        result = run_script(SCRIPT_PATH, config, "--repo", "test-repo", "--diff", "--apply")
+        result = call_main(SCRIPT_PATH, config, "--repo", "test-repo", "--diff", "--apply")
         assert result.returncode != 0
         assert "cannot" in result.stderr.lower() or "together" in result.stderr.lower()
 
+    def test_diff_all_rejects_single_repo(self):
+        """--diff-all covers every configured repo, so --repo is an error."""
+        result = call_main(SCRIPT_PATH, CONFIG_PATH, "--diff-all", "--repo", "test-repo")
+        assert result.returncode != 0
+        assert "--diff-all" in result.stderr
+
 
 class TestConfigLoading:
     """Test configuration file loading."""
 
-    def test_loads_default_config(self):
+    def test_loads_default_config(self, branch_protection_config):
         """Should load config.json from script directory by default."""
         assert CONFIG_PATH.exists(), "Default config.json should exist"
 
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         assert "organization" in config
         assert "ruleset" in config
@@ -110,28 +118,25 @@ class TestConfigLoading:
 class TestConfigSchema:
     """Test that the production config has the expected schema."""
 
-    def test_config_has_required_sections(self):
+    def test_config_has_required_sections(self, branch_protection_config):
         """Production config should have all required sections."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         assert "organization" in config
         assert "bypass_actor" in config
         assert "ruleset" in config
 
-    def test_bypass_actor_schema(self):
+    def test_bypass_actor_schema(self, branch_protection_config):
         """Bypass actor should have required fields."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         bypass_actor = config.get("bypass_actor", {})
         assert "name" in bypass_actor
         assert "type" in bypass_actor
 
-    def test_ruleset_schema(self):
+    def test_ruleset_schema(self, branch_protection_config):
         """Ruleset should have required fields."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         ruleset = config.get("ruleset", {})
         assert "name" in ruleset
@@ -139,19 +144,17 @@ class TestConfigSchema:
         assert "branch_pattern" in ruleset
         assert "rules" in ruleset
 
-    def test_ruleset_rules_schema(self):
+    def test_ruleset_rules_schema(self, branch_protection_config):
         """Ruleset rules should have expected structure."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         rules = config.get("ruleset", {}).get("rules", {})
         assert "require_pull_request" in rules
         assert "require_status_checks" in rules
 
-    def test_pull_request_rules_schema(self):
+    def test_pull_request_rules_schema(self, branch_protection_config):
         """Pull request rules should have expected fields (defaults for non-CLI options)."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         pr_rules = config.get("ruleset", {}).get("rules", {}).get("require_pull_request", {})
         # Only check fields that are defaults, not CLI-provided ones
@@ -163,27 +166,24 @@ class TestConfigSchema:
         for key in expected_keys:
             assert key in pr_rules, f"require_pull_request.{key} should be present"
 
-    def test_status_checks_rules_schema(self):
+    def test_status_checks_rules_schema(self, branch_protection_config):
         """Status checks rules should have expected fields (defaults for non-CLI options)."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         sc_rules = config.get("ruleset", {}).get("rules", {}).get("require_status_checks", {})
         # Only check fields that are defaults, required_checks is provided via CLI
         assert "strict_required_status_checks_policy" in sc_rules
         assert "do_not_enforce_on_create" in sc_rules
 
-    def test_organization_is_cuioss(self):
+    def test_organization_is_cuioss(self, branch_protection_config):
         """Organization should be 'cuioss'."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         assert config["organization"] == "cuioss"
 
-    def test_bypass_actor_is_release_bot(self):
+    def test_bypass_actor_is_release_bot(self, branch_protection_config):
         """Bypass actor should be the release bot."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         assert config["bypass_actor"]["name"] == "cuioss-release-bot"
         assert config["bypass_actor"]["type"] == "app"
@@ -192,19 +192,17 @@ class TestConfigSchema:
 class TestRulesetPayloadBuild:
     """Test ruleset payload construction logic."""
 
-    def test_enforcement_values(self):
+    def test_enforcement_values(self, branch_protection_config):
         """Enforcement should be one of the valid values."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         enforcement = config["ruleset"]["enforcement"]
         valid_values = ["active", "disabled", "evaluate"]
         assert enforcement in valid_values, f"enforcement should be one of {valid_values}"
 
-    def test_branch_pattern_is_main(self):
+    def test_branch_pattern_is_main(self, branch_protection_config):
         """Branch pattern should typically be 'main'."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
 
         assert config["ruleset"]["branch_pattern"] == "main"
 
@@ -273,64 +271,56 @@ def _load_module():
 class TestMergeQueueConfig:
     """Test the merge_queue block in config.json."""
 
-    def test_config_has_merge_queue_block(self):
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+    def test_config_has_merge_queue_block(self, branch_protection_config):
+        config = branch_protection_config
         assert "merge_queue" in config, "config.json should define a merge_queue block"
 
-    def test_merge_method_is_squash(self):
+    def test_merge_method_is_squash(self, branch_protection_config):
         """merge_method must stay SQUASH to match the org merge policy."""
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
         assert config["merge_queue"]["merge_method"] == "SQUASH"
 
-    def test_ruleset_name_is_org_managed(self):
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+    def test_ruleset_name_is_org_managed(self, branch_protection_config):
+        config = branch_protection_config
         assert config["merge_queue"]["ruleset_name"] == "main-merge-queue"
 
-    def test_merge_queue_repos_is_list(self):
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+    def test_merge_queue_repos_is_list(self, branch_protection_config):
+        config = branch_protection_config
         assert isinstance(config["merge_queue"]["merge_queue_repos"], list)
 
 
 class TestMergeQueuePayloadBuild:
     """Test the merge-queue ruleset payload construction."""
 
-    def test_payload_uses_release_bot_bypass(self):
+    def test_payload_uses_release_bot_bypass(self, branch_protection_config):
         """The queue ruleset must carry the release-bot bypass so releases work."""
         module = _load_module()
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
         payload = module.build_merge_queue_payload(config, "2753519")
         assert payload["bypass_actors"] == [
             {"actor_id": 2753519, "actor_type": "Integration", "bypass_mode": "always"}
         ]
 
-    def test_payload_has_squash_merge_queue_rule(self):
+    def test_payload_has_squash_merge_queue_rule(self, branch_protection_config):
         module = _load_module()
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
         payload = module.build_merge_queue_payload(config, "2753519")
         rules = payload["rules"]
         assert len(rules) == 1
         assert rules[0]["type"] == "merge_queue"
         assert rules[0]["parameters"]["merge_method"] == "SQUASH"
 
-    def test_payload_targets_main(self):
+    def test_payload_targets_main(self, branch_protection_config):
         module = _load_module()
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
         payload = module.build_merge_queue_payload(config, "2753519")
         assert payload["conditions"]["ref_name"]["include"] == ["refs/heads/main"]
         assert payload["enforcement"] == "active"
 
-    def test_normalize_roundtrip_matches(self):
+    def test_normalize_roundtrip_matches(self, branch_protection_config):
         """A payload normalizes equal to itself (diff would report 'none')."""
         module = _load_module()
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
+        config = branch_protection_config
         payload = module.build_merge_queue_payload(config, "2753519")
         assert (
             module.normalize_merge_queue_for_comparison(payload)
@@ -350,9 +340,9 @@ class TestStrictPolicyUnderMergeQueue:
     readiness is what auto-merge waits on -- so the PR never becomes mergeable.
     """
 
-    def _config(self) -> dict:
-        with open(CONFIG_PATH) as f:
-            return json.load(f)
+    @pytest.fixture
+    def config(self, branch_protection_config) -> dict:
+        return branch_protection_config
 
     def _strict_of(self, payload: dict) -> bool | None:
         for rule in payload["rules"]:
@@ -360,18 +350,17 @@ class TestStrictPolicyUnderMergeQueue:
                 return rule["parameters"]["strict_required_status_checks_policy"]
         return None
 
-    def test_merge_queue_repo_gets_strict_off(self):
+    def test_merge_queue_repo_gets_strict_off(self, config):
         module = _load_module()
         payload = module.build_ruleset_payload(
-            self._config(), "2753519",
+            config, "2753519",
             required_checks_override=["build / conclusion"],
             merge_queue_enabled=True,
         )
         assert self._strict_of(payload) is False
 
-    def test_non_queue_repo_keeps_config_value(self):
+    def test_non_queue_repo_keeps_config_value(self, config):
         module = _load_module()
-        config = self._config()
         payload = module.build_ruleset_payload(
             config, "2753519",
             required_checks_override=["build / conclusion"],
@@ -382,21 +371,19 @@ class TestStrictPolicyUnderMergeQueue:
         ]
         assert self._strict_of(payload) is expected
 
-    def test_uses_merge_queue_reads_the_repo_list(self):
+    def test_uses_merge_queue_reads_the_repo_list(self, config):
         module = _load_module()
-        config = self._config()
         listed = config["merge_queue"]["merge_queue_repos"][0]
         assert module.uses_merge_queue(config, listed) is True
         assert module.uses_merge_queue(config, "not-a-queue-repo") is False
 
-    def test_uses_merge_queue_handles_missing_repo(self):
+    def test_uses_merge_queue_handles_missing_repo(self, config):
         module = _load_module()
-        assert module.uses_merge_queue(self._config(), None) is False
+        assert module.uses_merge_queue(config, None) is False
 
-    def test_every_queue_repo_resolves_to_strict_off(self):
+    def test_every_queue_repo_resolves_to_strict_off(self, config):
         """Guard the wiring, not just the flag: config list -> payload."""
         module = _load_module()
-        config = self._config()
         for repo in config["merge_queue"]["merge_queue_repos"]:
             payload = module.build_ruleset_payload(
                 config, "2753519",
@@ -436,3 +423,305 @@ class TestMergeQueueArgValidation:
         )
         assert result.returncode != 0
         assert "together" in result.stderr.lower()
+
+
+class TestBatchLogCapture:
+    """Batch workers buffer their log lines so repositories don't interleave."""
+
+    def test_captures_lines_and_result(self, capsys):
+        module = _load_module()
+
+        def work(name):
+            module.log_info(f"processing {name}")
+            module.log_warn("careful")
+            return name.upper()
+
+        result, lines = module.run_captured(work, "repo")
+        assert result == "REPO"
+        assert len(lines) == 2
+        assert "processing repo" in lines[0]
+        assert "[WARN]" in lines[1]
+        assert capsys.readouterr().err == ""
+
+    def test_logs_print_directly_outside_capture(self, capsys):
+        module = _load_module()
+        module.run_captured(lambda: None)
+        module.log_info("direct")
+        assert "direct" in capsys.readouterr().err
+
+
+class TestGhGetCache:
+    """API GETs are memoized; writes invalidate the touched repository."""
+
+    @staticmethod
+    def _fake_send(module, calls):
+        def fake_send(method, path, payload=None, extra_headers=None):
+            calls.append((method, path))
+            body = json.dumps([{"id": 7, "name": "main-branch-protection"}])
+            return module.ApiResponse(200 if method == "GET" else 204, body)
+        return fake_send
+
+    def test_repeated_get_hits_cache(self):
+        module = _load_module()
+        calls = []
+        with patch.object(module, "send", self._fake_send(module, calls)):
+            assert module.get_existing_ruleset_id("org", "repo", "main-branch-protection") == "7"
+            assert module.get_existing_ruleset_id("org", "repo", "main-branch-protection") == "7"
+        assert calls == [("GET", "repos/org/repo/rulesets")]
+
+    def test_write_invalidates_same_repo_only(self):
+        module = _load_module()
+        calls = []
+        with patch.object(module, "send", self._fake_send(module, calls)):
+            module.list_rulesets("org", "repo")
+            module.list_rulesets("org", "other")
+            module.gh_request("DELETE", "repos/org/repo/rulesets/7")
+            module.list_rulesets("org", "repo")
+            module.list_rulesets("org", "other")
+        assert calls.count(("GET", "repos/org/repo/rulesets")) == 2
+        assert calls.count(("GET", "repos/org/other/rulesets")) == 1
+
+    def test_concurrent_reads_and_writes_share_cache_safely(self):
+        module = _load_module()
+        calls = []
+
+        def worker(index):
+            for _ in range(50):
+                module.list_rulesets("org", f"repo{index}")
+                module.gh_request("DELETE", f"repos/org/repo{index}/rulesets/7")
+
+        with patch.object(module, "send", self._fake_send(module, calls)):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(worker, range(8)))
+        assert calls.count(("GET", "repos/org/repo0/rulesets")) == 50
+
+    def test_write_response_seeds_detail_lookup(self):
+        module = _load_module()
+        calls = []
+        stored = {"id": 7, "name": "main-branch-protection", "rules": [], "conditions": {}}
+        with patch.object(module, "send", self._fake_send(module, calls)):
+            module.remember_ruleset("org", "repo", json.dumps(stored))
+            assert module.get_existing_ruleset("org", "repo", "main-branch-protection") == stored
+        assert calls == [("GET", "repos/org/repo/rulesets")]
+
+    def test_get_app_id_filters_installations(self):
+        module = _load_module()
+        body = json.dumps({"installations": [
+            {"app_slug": "other", "app_id": 1},
+            {"app_slug": "cuioss-release-bot", "app_id": 42},
+        ]})
+        with patch.object(module, "send", return_value=module.ApiResponse(200, body)):
+            assert module.get_app_id("org", "cuioss-release-bot") == "42"
+            assert module.get_app_id("org", "missing") is None
+
+
+class TestListWorkflowChecks:
+    """Job lists are fetched concurrently but merged in run order."""
+
+    def test_latest_run_per_workflow_merged_in_order(self):
+        module = _load_module()
+        responses = {
+            "repos/org/repo/actions/runs?per_page=20": {"workflow_runs": [
+                {"id": 3, "name": "build"},
+                {"id": 2, "name": "release"},
+                {"id": 1, "name": "build"},
+            ]},
+            "repos/org/repo/actions/runs/3/jobs": {"jobs": [
+                {"name": "build / verify", "conclusion": "success"},
+                {"name": "shared", "conclusion": "success"},
+            ]},
+            "repos/org/repo/actions/runs/2/jobs": {"jobs": [
+                {"name": "shared", "conclusion": "failure"},
+                {"name": "publish", "conclusion": "skipped"},
+            ]},
+        }
+        requested = []
+
+        def fake_send(method, path, payload=None, extra_headers=None):
+            requested.append(path)
+            return module.ApiResponse(200, json.dumps(responses[path]))
+
+        with patch.object(module, "send", fake_send):
+            checks = module.list_workflow_checks("org", "repo")
+
+        assert checks == [
+            {"name": "build / verify", "workflow": "build", "conclusion": "success"},
+            {"name": "shared", "workflow": "build", "conclusion": "success"},
+            {"name": "publish", "workflow": "release", "conclusion": "skipped"},
+        ]
+        assert "repos/org/repo/actions/runs/1/jobs" not in requested
+
+
+class TestGraphqlRulesetPrefetch:
+    """The batch prefetch seeds the REST list cache for answered repos."""
+
+    def test_prefetch_seeds_list_cache(self):
+        module = _load_module()
+        response = {"data": {
+            "r0": {"rulesets": {"nodes": [
+                {"databaseId": 11, "name": "main-branch-protection"},
+                {"databaseId": 12, "name": "main-merge-queue"},
+            ]}},
+            "r1": {"rulesets": {"nodes": []}},
+            "r2": None,
+        }}
+        sent = []
+
+        def fake_send(method, path, payload=None, extra_headers=None):
+            sent.append((method, path))
+            if path == "graphql":
+                return module.ApiResponse(200, json.dumps(response))
+            return module.ApiResponse(200, "[]")
+
+        with patch.object(module, "send", fake_send):
+            found = module.fetch_all_existing_rulesets(
+                "org", ["a", "b", "missing"], "main-branch-protection"
+            )
+            assert found == {"a": {"id": 11, "name": "main-branch-protection"}, "b": None}
+            assert module.get_existing_ruleset_id("org", "a", "main-merge-queue") == "12"
+            assert module.get_existing_ruleset_id("org", "b", "main-branch-protection") is None
+            module.list_rulesets("org", "missing")
+
+        assert sent == [("POST", "graphql"), ("GET", "repos/org/missing/rulesets")]
+
+    def test_prefetch_chunks_repositories(self):
+        module = _load_module()
+        queries = []
+
+        def fake_send(method, path, payload=None, extra_headers=None):
+            queries.append(json.loads(payload)["query"])
+            return module.ApiResponse(200, json.dumps({"data": {}}))
+
+        repos = [f"repo{i}" for i in range(module.GRAPHQL_BATCH_SIZE + 1)]
+        with patch.object(module, "send", fake_send):
+            module.fetch_all_existing_rulesets("org", repos, "x")
+        assert len(queries) == 2
+        assert queries[1].count("repository(") == 1
+
+
+class TestApplyRulesetSkipsNoop:
+    """apply_ruleset only writes when the stored ruleset differs."""
+
+    @staticmethod
+    def _run_apply(module, config, stored_reviews):
+        stored = module.build_ruleset_payload(config, "123", ["build"], stored_reviews)
+        stored["id"] = 5
+        responses = {
+            "repos/org/repo/rulesets": [{"id": 5, "name": config["ruleset"]["name"]}],
+            "repos/org/repo/rulesets/5": stored,
+        }
+        sent = []
+
+        def fake_send(method, path, payload=None, extra_headers=None):
+            sent.append((method, path))
+            return module.ApiResponse(200, json.dumps(responses.get(path, stored)))
+
+        with patch.object(module, "send", fake_send):
+            _, lines = module.run_captured(module.apply_ruleset, "org", "repo", config, "123", ["build"], 1)
+        return sent, lines
+
+    def test_matching_ruleset_is_not_rewritten(self, branch_protection_config):
+        sent, lines = self._run_apply(_load_module(), branch_protection_config, stored_reviews=1)
+        assert all(method == "GET" for method, _ in sent)
+        assert any("Already up to date" in line for line in lines)
+
+    def test_differing_ruleset_is_updated(self, branch_protection_config):
+        sent, _ = self._run_apply(_load_module(), branch_protection_config, stored_reviews=0)
+        assert ("PUT", "repos/org/repo/rulesets/5") in sent
+
+
+class TestEtagCache:
+    """Persisted ETags turn repeat GETs into conditional requests."""
+
+    def test_conditional_get_reuses_stored_body(self, temp_dir):
+        module = _load_module()
+        module.ETAG_CACHE_PATH = temp_dir / "branch-protection-etags.json"
+        seen_headers = []
+
+        def fake_send(method, path, payload=None, extra_headers=None):
+            seen_headers.append(extra_headers)
+            if extra_headers:
+                return module.ApiResponse(304, "")
+            return module.ApiResponse(200, '[{"id": 1}]', '"abc"')
+
+        with patch.object(module, "send", fake_send):
+            assert module.gh_get("repos/org/repo/rulesets").body == '[{"id": 1}]'
+            module.save_etag_cache()
+
+            fresh = _load_module()
+            fresh.ETAG_CACHE_PATH = module.ETAG_CACHE_PATH
+            fresh.load_etag_cache()
+            with patch.object(fresh, "send", fake_send):
+                result = fresh.gh_get("repos/org/repo/rulesets")
+
+        assert result.ok and result.body == '[{"id": 1}]'
+        assert seen_headers == [None, {"If-None-Match": '"abc"'}]
+
+    def test_expired_entries_are_dropped(self, temp_dir):
+        module = _load_module()
+        module.ETAG_CACHE_PATH = temp_dir / "branch-protection-etags.json"
+        module.ETAG_CACHE_PATH.write_text(json.dumps({
+            "old": {"etag": "x", "body": "[]", "fetched_at": 0},
+            "new": {"etag": "y", "body": "[]", "fetched_at": time.time()},
+        }))
+        module.load_etag_cache()
+        assert set(module._etag_cache) == {"new"}
+
+    def test_cache_lives_in_xdg_cache_home(self, temp_dir):
+        module = _load_module()
+        assert module.ETAG_CACHE_PATH.parent == Path(os.environ["XDG_CACHE_HOME"]) / "cuioss"
+        module.ETAG_CACHE_PATH = temp_dir / "cuioss" / "branch-protection-etags.json"
+        module._etag_cache["p"] = {"etag": "x", "body": "[]", "fetched_at": time.time()}
+        module.save_etag_cache()
+        assert json.loads(module.ETAG_CACHE_PATH.read_text())["p"]["etag"] == "x"
+
+
+class TestOrgLookupCaching:
+    """Fixed per-run costs can be skipped."""
+
+    def test_deps_check_skipped_with_env(self, monkeypatch):
+        module = _load_module()
+        monkeypatch.setenv("GH_DEPS_OK", "1")
+        with patch.object(module.subprocess, "run", side_effect=AssertionError("gh invoked")):
+            module.check_dependencies()
+
+    def test_app_id_persisted_and_reused(self):
+        module = _load_module()
+        body = json.dumps({"installations": [{"app_slug": "bot", "app_id": 9}]})
+        with patch.object(module, "send", return_value=module.ApiResponse(200, body)) as send:
+            assert module.get_app_id("org", "bot") == "9"
+            assert module.get_app_id("org", "bot") == "9"
+        assert send.call_count == 1
+        assert module._etag_cache["app-id:org/bot"]["app_id"] == "9"
+
+        fresh = _load_module()
+        fresh._etag_cache.update(module._etag_cache)
+        with patch.object(fresh, "send", side_effect=AssertionError("API called")):
+            assert fresh.get_app_id("org", "bot") == "9"
+
+
+class TestBatchCheckpoint:
+    """Batch progress survives interruptions, but only for the same config."""
+
+    def test_round_trip(self, temp_dir):
+        module = _load_module()
+        state_path = temp_dir / "state.json"
+        state = {"config_digest": "abc", "completed": ["a", "b"], "failed": ["c"]}
+        module.save_checkpoint(state_path, state)
+        loaded = module.load_checkpoint(state_path, "abc")
+        assert loaded["completed"] == ["a", "b"]
+        assert "updated_at" in loaded
+        assert not (temp_dir / "state.tmp").exists()
+
+    def test_other_config_starts_fresh(self, temp_dir):
+        module = _load_module()
+        state_path = temp_dir / "state.json"
+        module.save_checkpoint(state_path, {"config_digest": "abc", "completed": ["a"], "failed": []})
+        assert module.load_checkpoint(state_path, "xyz")["completed"] == []
+
+    def test_missing_or_corrupt_file_starts_fresh(self, temp_dir):
+        module = _load_module()
+        state_path = temp_dir / "state.json"
+        assert module.load_checkpoint(state_path, "abc")["completed"] == []
+        state_path.write_text("{not json")
+        assert module.load_checkpoint(state_path, "abc")["completed"] == []
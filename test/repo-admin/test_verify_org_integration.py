@@ -4,12 +4,18 @@ Note: These tests focus on argument parsing and logic validation.
 Actual GitHub API calls are not tested here as they require authentication.
 """
 
+import json
 import sys
-from pathlib import Path
+from unittest.mock import patch
 
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from conftest import PROJECT_ROOT, run_script
+import pytest
+
+from conftest import PROJECT_ROOT, call_main, load_script, run_script
+
+# Add repo-settings to path so the scripts' shared client can be imported
+sys.path.insert(0, str(PROJECT_ROOT / "repo-settings"))
+
+from github_api import ApiResponse
 
 SCRIPT_PATH = PROJECT_ROOT / "repo-settings/verify-org-integration.py"
 
@@ -17,23 +23,19 @@ SCRIPT_PATH = PROJECT_ROOT / "repo-settings/verify-org-integration.py"
 class TestArgumentValidation:
     """Test command line argument validation."""
 
-    def test_repo_required(self, temp_dir):
-        """Should fail without --repo."""
-        result = run_script(SCRIPT_PATH, "--diff")
-        assert result.returncode != 0
-        assert "required" in result.stderr.lower() or "--repo" in result.stderr
-
-    def test_diff_or_apply_required(self, temp_dir):
-        """Should fail without --diff or --apply."""
-        result = run_script(SCRIPT_PATH, "--repo", "test-repo")
+    # (arguments, fragments of which at least one must appear in stderr)
+    INVALID_ARGS = [
+        (("--diff",), ("required", "--repo")),
+        (("--repo", "test-repo"), ("must specify", "--diff", "--apply")),
+        (("--repo", "test-repo", "--diff", "--apply"), ("cannot", "together")),
+    ]
+
+    @pytest.mark.parametrize("args,fragments", INVALID_ARGS)
+    def test_invalid_combination_fails(self, args, fragments):
+        """Missing --repo, no action, or both actions should fail with a message."""
+        result = call_main(SCRIPT_PATH, *args)
         assert result.returncode != 0
-        assert "must specify" in result.stderr.lower() or "--diff" in result.stderr or "--apply" in result.stderr
-
-    def test_diff_and_apply_mutually_exclusive(self, temp_dir):
-        """Should fail with both --diff and --apply."""
-        result = run_script(SCRIPT_PATH, "--repo", "test-repo", "--diff", "--apply")
-        assert result.returncode != 0
-        assert "cannot" in result.stderr.lower() or "together" in result.stderr.lower()
+        assert any(fragment in result.stderr.lower() for fragment in fragments)
 
 
 class TestConstants:
@@ -41,14 +43,7 @@ class TestConstants:
 
     def test_org_level_secrets_defined(self):
         """Org-level secrets list should be defined and non-empty."""
-        import importlib.util
-
-        spec = importlib.util.spec_from_file_location("verify_org_integration", SCRIPT_PATH)
-        assert spec is not None
-        assert spec.loader is not None
-
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        module = load_script(SCRIPT_PATH)
 
         assert hasattr(module, "ORG_LEVEL_SECRETS")
         assert len(module.ORG_LEVEL_SECRETS) > 0
@@ -57,41 +52,20 @@ class TestConstants:
 
     def test_sonar_token_is_org_level(self):
         """SONAR_TOKEN should be in org-level secrets."""
-        import importlib.util
-
-        spec = importlib.util.spec_from_file_location("verify_org_integration", SCRIPT_PATH)
-        assert spec is not None
-        assert spec.loader is not None
-
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        module = load_script(SCRIPT_PATH)
 
         assert "SONAR_TOKEN" in module.ORG_LEVEL_SECRETS
 
     def test_repo_level_secrets_empty(self):
         """Repo-level secrets list should be empty (all secrets are org-level)."""
-        import importlib.util
-
-        spec = importlib.util.spec_from_file_location("verify_org_integration", SCRIPT_PATH)
-        assert spec is not None
-        assert spec.loader is not None
-
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        module = load_script(SCRIPT_PATH)
 
         assert hasattr(module, "REPO_LEVEL_SECRETS")
         assert len(module.REPO_LEVEL_SECRETS) == 0
 
     def test_community_files_defined(self):
         """Community files list should be defined and non-empty."""
-        import importlib.util
-
-        spec = importlib.util.spec_from_file_location("verify_org_integration", SCRIPT_PATH)
-        assert spec is not None
-        assert spec.loader is not None
-
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        module = load_script(SCRIPT_PATH)
 
         assert hasattr(module, "ORG_COMMUNITY_FILES")
         assert len(module.ORG_COMMUNITY_FILES) > 0
@@ -107,40 +81,47 @@ class TestDiffOutput:
         """Diff mode should produce expected JSON structure (when API accessible)."""
         # This test verifies the compute_diff function output structure
         # Actual API testing requires authentication
-        import importlib.util
-
-        spec = importlib.util.spec_from_file_location("verify_org_integration", SCRIPT_PATH)
-        assert spec is not None
-        assert spec.loader is not None
-
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        module = load_script(SCRIPT_PATH)
 
         # Test compute_diff with no local path (secrets only)
         # Note: This will make API calls, so we just verify the function exists
         assert hasattr(module, "compute_diff")
         assert callable(module.compute_diff)
 
+    def test_diff_classifies_secrets(self):
+        """Org-level secrets are flagged; unknown secrets are left alone."""
+        module = load_script(SCRIPT_PATH)
 
-class TestLocalFileDetection:
-    """Test local file detection for community health files."""
+        secrets = [{"name": "CUSTOM_TOKEN"}, {"name": "SONAR_TOKEN"}, {"name": "GPG_PASSPHRASE"}]
+        with patch.object(module, "get_repo_secrets", return_value=secrets):
+            diff = module.compute_diff("cuioss", "test-repo", None)
 
-    def test_check_duplicate_files_finds_existing(self, temp_dir):
-        """Should detect duplicate community health files."""
-        import importlib.util
+        assert diff["secrets"]["repo_level"] == ["CUSTOM_TOKEN", "SONAR_TOKEN", "GPG_PASSPHRASE"]
+        assert diff["secrets"]["should_be_org_level"] == ["SONAR_TOKEN", "GPG_PASSPHRASE"]
+        assert diff["secrets"]["expected_repo_level"] == []
+        assert diff["overall_action"] == "update"
 
-        spec = importlib.util.spec_from_file_location("verify_org_integration", SCRIPT_PATH)
-        assert spec is not None
-        assert spec.loader is not None
 
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+def _make_files(base, names, content=b"Test content"):
+    """Create each named file under base with the same content."""
+    for name in names:
+        (base / name).write_bytes(content)
 
-        # Create test files
-        (temp_dir / "CODE_OF_CONDUCT.md").write_text("Test content")
-        (temp_dir / "SECURITY.md").write_text("Test content")
 
-        duplicates = module.check_duplicate_files(temp_dir)
+class TestLocalFileDetection:
+    """Test local file detection for community health files."""
+
+    @pytest.fixture
+    def duplicates_dir(self, temp_dir):
+        """A checkout holding two of the org-level community files."""
+        _make_files(temp_dir, ["CODE_OF_CONDUCT.md", "SECURITY.md"])
+        return temp_dir
+
+    def test_check_duplicate_files_finds_existing(self, duplicates_dir):
+        """Should detect duplicate community health files."""
+        module = load_script(SCRIPT_PATH)
+
+        duplicates = module.check_duplicate_files(duplicates_dir)
 
         assert "CODE_OF_CONDUCT.md" in duplicates
         assert "SECURITY.md" in duplicates
@@ -148,39 +129,40 @@ class TestLocalFileDetection:
 
     def test_check_duplicate_files_none_when_no_path(self):
         """Should return empty list when local_path is None."""
-        import importlib.util
-
-        spec = importlib.util.spec_from_file_location("verify_org_integration", SCRIPT_PATH)
-        assert spec is not None
-        assert spec.loader is not None
-
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        module = load_script(SCRIPT_PATH)
 
         duplicates = module.check_duplicate_files(None)
         assert duplicates == []
 
-    def test_remove_duplicate_files(self, temp_dir):
+    def test_remove_duplicate_files(self, duplicates_dir):
         """Should remove specified duplicate files."""
-        import importlib.util
+        module = load_script(SCRIPT_PATH)
+
+        removed = module.remove_duplicate_files(duplicates_dir, ["CODE_OF_CONDUCT.md", "SECURITY.md"])
+
+        assert "CODE_OF_CONDUCT.md" in removed
+        assert "SECURITY.md" in removed
+        assert not (duplicates_dir / "CODE_OF_CONDUCT.md").exists()
+        assert not (duplicates_dir / "SECURITY.md").exists()
 
-        spec = importlib.util.spec_from_file_location("verify_org_integration", SCRIPT_PATH)
-        assert spec is not None
-        assert spec.loader is not None
+    def test_missing_files_and_paths_are_skipped(self, temp_dir):
+        """Absent files are not reported as removed; a missing path has no duplicates."""
+        module = load_script(SCRIPT_PATH)
 
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        _make_files(temp_dir, ["SECURITY.md"])
 
-        # Create test files
-        (temp_dir / "CODE_OF_CONDUCT.md").write_text("Test content")
-        (temp_dir / "SECURITY.md").write_text("Test content")
+        assert module.remove_duplicate_files(temp_dir, ["CONTRIBUTING.md", "SECURITY.md"]) == ["SECURITY.md"]
+        assert module.check_duplicate_files(temp_dir / "missing") == []
 
-        removed = module.remove_duplicate_files(temp_dir, ["CODE_OF_CONDUCT.md", "SECURITY.md"])
+    def test_unremovable_file_is_reported_not_raised(self, temp_dir, capsys):
+        """A removal error is logged and the remaining files are still processed."""
+        module = load_script(SCRIPT_PATH)
 
-        assert "CODE_OF_CONDUCT.md" in removed
-        assert "SECURITY.md" in removed
-        assert not (temp_dir / "CODE_OF_CONDUCT.md").exists()
-        assert not (temp_dir / "SECURITY.md").exists()
+        (temp_dir / "CONTRIBUTING.md").mkdir()
+        _make_files(temp_dir, ["SECURITY.md"])
+
+        assert module.remove_duplicate_files(temp_dir, ["CONTRIBUTING.md", "SECURITY.md"]) == ["SECURITY.md"]
+        assert "Failed to remove CONTRIBUTING.md" in capsys.readouterr().err
 
 
 class TestVerification:
@@ -188,14 +170,7 @@ class TestVerification:
 
     def test_verify_file_removed(self, temp_dir):
         """Should verify file removal correctly."""
-        import importlib.util
-
-        spec = importlib.util.spec_from_file_location("verify_org_integration", SCRIPT_PATH)
-        assert spec is not None
-        assert spec.loader is not None
-
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        module = load_script(SCRIPT_PATH)
 
         # File doesn't exist - should return True
         assert module.verify_file_removed(temp_dir, "nonexistent.md") is True
@@ -206,19 +181,79 @@ class TestVerification:
 
     def test_apply_output_includes_verification(self):
         """Apply output should include verification results structure."""
-        import importlib.util
-
-        spec = importlib.util.spec_from_file_location("verify_org_integration", SCRIPT_PATH)
-        assert spec is not None
-        assert spec.loader is not None
-
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        module = load_script(SCRIPT_PATH)
 
         # Verify apply_fixes function exists and has expected signature
         assert hasattr(module, "apply_fixes")
         assert callable(module.apply_fixes)
 
+    def test_apply_deletes_concurrently_and_verifies_with_one_listing(self):
+        """Secrets are deleted in parallel and verified against a single re-fetch."""
+        module = load_script(SCRIPT_PATH)
+
+        names = ["GPG_PRIVATE_KEY", "SONAR_TOKEN", "OSS_SONATYPE_USERNAME"]
+        with patch.object(module, "delete_repo_secret", side_effect=lambda o, r, n: n != "SONAR_TOKEN"), \
+                patch.object(module, "get_repo_secrets", return_value=[{"name": "SONAR_TOKEN"}]) as listing:
+            result = module.apply_fixes("cuioss", "test-repo", None, names)
+
+        assert result["secrets_deleted"] == ["GPG_PRIVATE_KEY", "OSS_SONATYPE_USERNAME"]
+        assert result["verification"]["all_passed"] is True
+        assert result["success"] is False
+        assert listing.call_count == 1
+
+    def test_secret_calls_use_rest_api(self):
+        """Secret listing and deletion go straight to the REST API."""
+        module = load_script(SCRIPT_PATH)
+
+        replies = {
+            ("GET", "repos/cuioss/r/actions/secrets?per_page=100&page=1"): ApiResponse(
+                200, '{"total_count": 1, "secrets": [{"name": "SONAR_TOKEN"}]}'
+            ),
+            ("DELETE", "repos/cuioss/r/actions/secrets/SONAR_TOKEN"): ApiResponse(204, ""),
+        }
+        with patch.object(module, "gh_request", side_effect=lambda m, p: replies.get((m, p), ApiResponse(404, ""))):
+            assert module.get_repo_secrets("cuioss", "r") == [{"name": "SONAR_TOKEN"}]
+            assert module.delete_repo_secret("cuioss", "r", "SONAR_TOKEN") is True
+            assert module.delete_repo_secret("cuioss", "r", "MISSING") is False
+            assert module.get_repo_secrets("cuioss", "gone") == []
+
+    def test_secret_listing_follows_pages_to_total_count(self):
+        """Listings larger than one page are fetched page by page."""
+        module = load_script(SCRIPT_PATH)
+
+        first = [{"name": f"S{i}"} for i in range(100)]
+        pages = {
+            1: ApiResponse(200, json.dumps({"total_count": 101, "secrets": first})),
+            2: ApiResponse(200, json.dumps({"total_count": 101, "secrets": [{"name": "LAST"}]})),
+        }
+        requested = []
+
+        def fake_request(method, path):
+            requested.append(path)
+            return pages[int(path.rsplit("page=", 1)[1])]
+
+        with patch.object(module, "gh_request", side_effect=fake_request):
+            secrets = module.get_repo_secrets("cuioss", "r")
+
+        assert secrets == first + [{"name": "LAST"}]
+        assert requested == [
+            "repos/cuioss/r/actions/secrets?per_page=100&page=1",
+            "repos/cuioss/r/actions/secrets?per_page=100&page=2",
+        ]
+
+    def test_secret_listing_is_shared_until_cleared(self):
+        """Deletion checks reuse one listing; clearing the cache forces a new one."""
+        module = load_script(SCRIPT_PATH)
+        module.remaining_secret_names.cache_clear()
+
+        with patch.object(module, "get_repo_secrets", return_value=[{"name": "SONAR_TOKEN"}]) as listing:
+            assert module.verify_secret_deleted("cuioss", "r", "GPG_PRIVATE_KEY") is True
+            assert module.verify_secret_deleted("cuioss", "r", "SONAR_TOKEN") is False
+            assert listing.call_count == 1
+            module.remaining_secret_names.cache_clear()
+            module.verify_secret_deleted("cuioss", "r", "SONAR_TOKEN")
+            assert listing.call_count == 2
+
 
 class TestHelpOutput:
     """Test help and usage output."""
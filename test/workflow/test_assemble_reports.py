@@ -1,16 +1,23 @@
 """Tests for assemble-reports.py - test report assembly script."""
 
 import re
-import sys
 from pathlib import Path
 
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from conftest import PROJECT_ROOT, run_script
+import pytest
+
+from conftest import PROJECT_ROOT, call_main, run_script
 
 SCRIPT_PATH = PROJECT_ROOT / ".github/actions/assemble-test-reports/assemble-reports.py"
 
 
+@pytest.fixture(scope="module")
+def shared_reports(tmp_path_factory):
+    """A reports folder holding one file, for tests that only copy from it."""
+    reports_dir = tmp_path_factory.mktemp("reports")
+    (reports_dir / "test.html").write_text("test")
+    return reports_dir
+
+
 def _parse_output(stdout: str) -> dict[str, str]:
     """Parse GITHUB_OUTPUT-style key=value lines into a dict."""
     return {
@@ -25,17 +32,17 @@ class TestArgumentValidation:
 
     def test_requires_report_name(self):
         """Should fail when --report-name is missing."""
-        result = run_script(SCRIPT_PATH, "--reports-folder", "some/dir")
+        result = call_main(SCRIPT_PATH, "--reports-folder", "some/dir")
         assert result.returncode != 0
 
     def test_requires_reports_folder(self):
         """Should fail when --reports-folder is missing."""
-        result = run_script(SCRIPT_PATH, "--report-name", "my-report")
+        result = call_main(SCRIPT_PATH, "--report-name", "my-report")
         assert result.returncode != 0
 
     def test_empty_reports_folder_string_fails(self, temp_dir):
         """Should fail when --reports-folder is empty string."""
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "my-report",
             "--reports-folder", "",
@@ -50,7 +57,7 @@ class TestArgumentValidation:
         reports_dir.mkdir()
         (reports_dir / "index.html").write_text("test")
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "my-report",
             "--reports-folder", str(reports_dir),
@@ -66,7 +73,7 @@ class TestArgumentValidation:
         (reports_dir / "test.txt").write_text("test")
         output_dir = temp_dir / "nonexistent" / "output"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "my-report",
             "--reports-folder", str(reports_dir),
@@ -110,7 +117,7 @@ class TestDirectoryAssembly:
         folder_arg = f"{dir1}\n{dir2}"
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "my-report",
             "--reports-folder", folder_arg,
@@ -129,7 +136,7 @@ class TestDirectoryAssembly:
         (deep_dir / "data.json").write_text("{}")
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", str(deep_dir),
@@ -140,6 +147,24 @@ class TestDirectoryAssembly:
         report_path = Path(outputs["report-dir"])
         assert (report_path / "my-reports" / "data.json").exists()
 
+    def test_leaf_name_with_trailing_slash(self, temp_dir):
+        """Should ignore a trailing slash when extracting the leaf name."""
+        reports_dir = temp_dir / "target" / "my-reports"
+        reports_dir.mkdir(parents=True)
+        (reports_dir / "data.json").write_text("{}")
+        output_dir = temp_dir / "out"
+
+        result = call_main(
+            SCRIPT_PATH,
+            "--report-name", "test",
+            "--reports-folder", f"{reports_dir}/",
+            "--output-dir", str(output_dir),
+        )
+        assert result.returncode == 0
+        outputs = _parse_output(result.stdout)
+        report_path = Path(outputs["report-dir"])
+        assert (report_path / "my-reports" / "data.json").exists()
+
     def test_missing_folder_warns_and_continues(self, temp_dir):
         """Should warn for missing folder but continue if others exist."""
         existing = temp_dir / "target" / "results"
@@ -149,7 +174,7 @@ class TestDirectoryAssembly:
         folder_arg = f"/nonexistent/path\n{existing}"
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", folder_arg,
@@ -166,7 +191,7 @@ class TestDirectoryAssembly:
         folder_arg = "/nonexistent/a\n/nonexistent/b"
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", folder_arg,
@@ -188,7 +213,7 @@ class TestDirectoryAssembly:
         folder_arg = f"{dir1}\n{dir2}"
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", folder_arg,
@@ -202,6 +227,52 @@ class TestDirectoryAssembly:
         # Second copy uses suffixed name
         assert (report_path / "reports-2" / "b.txt").exists()
 
+    def test_repeated_leaf_names_numbered_in_order(self, temp_dir):
+        """Should number every further duplicate leaf name in input order."""
+        dirs = []
+        for module in ("module-a", "module-b", "module-c"):
+            d = temp_dir / module / "reports"
+            d.mkdir(parents=True)
+            (d / f"{module}.txt").write_text(module)
+            dirs.append(str(d))
+        output_dir = temp_dir / "out"
+
+        result = call_main(
+            SCRIPT_PATH,
+            "--report-name", "test",
+            "--reports-folder", "\n".join(dirs),
+            "--output-dir", str(output_dir),
+        )
+        assert result.returncode == 0
+        report_path = Path(_parse_output(result.stdout)["report-dir"])
+        assert (report_path / "reports" / "module-a.txt").exists()
+        assert (report_path / "reports-2" / "module-b.txt").exists()
+        assert (report_path / "reports-3" / "module-c.txt").exists()
+
+    def test_nested_tree_copied(self, temp_dir):
+        """Should copy nested subdirectories, empty directories and file contents."""
+        reports_dir = temp_dir / "results"
+        (reports_dir / "assets" / "css").mkdir(parents=True)
+        (reports_dir / "empty").mkdir()
+        (reports_dir / "index.html").write_text("<html>index</html>")
+        (reports_dir / "assets" / "css" / "style.css").write_text("body {}")
+        (reports_dir / "data.bin").write_bytes(bytes(range(256)) * 1024)
+        output_dir = temp_dir / "out"
+
+        result = call_main(
+            SCRIPT_PATH,
+            "--report-name", "test",
+            "--reports-folder", str(reports_dir),
+            "--output-dir", str(output_dir),
+        )
+        assert result.returncode == 0
+        outputs = _parse_output(result.stdout)
+        copied = Path(outputs["report-dir"]) / "results"
+        assert (copied / "index.html").read_text() == "<html>index</html>"
+        assert (copied / "assets" / "css" / "style.css").read_text() == "body {}"
+        assert (copied / "data.bin").read_bytes() == bytes(range(256)) * 1024
+        assert (copied / "empty").is_dir()
+
 
 class TestLogCollection:
     """Test log file collection logic."""
@@ -217,7 +288,7 @@ class TestLogCollection:
 
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", str(reports_dir),
@@ -244,7 +315,7 @@ class TestLogCollection:
         logs_arg = f"{log1}\n{log2}"
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", str(reports_dir),
@@ -267,7 +338,7 @@ class TestLogCollection:
         log_file.write_text("content")
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", str(reports_dir),
@@ -288,7 +359,7 @@ class TestLogCollection:
         logs_arg = "/nonexistent/missing.log"
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", str(reports_dir),
@@ -302,14 +373,12 @@ class TestLogCollection:
 class TestTimestampedNaming:
     """Test timestamped directory naming."""
 
-    def test_name_format(self, temp_dir):
+    def test_name_format(self, temp_dir, shared_reports):
         """Should generate name matching expected pattern."""
-        reports_dir = temp_dir / "reports"
-        reports_dir.mkdir()
-        (reports_dir / "test.html").write_text("test")
+        reports_dir = shared_reports
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "e-2-e-playwright",
             "--reports-folder", str(reports_dir),
@@ -321,14 +390,12 @@ class TestTimestampedNaming:
         # Pattern: <name>-YYYY-MM-DD-HHmm-SSSS
         assert re.match(r"e-2-e-playwright-\d{4}-\d{2}-\d{2}-\d{4}-\d{4}$", dirname)
 
-    def test_report_name_prefix(self, temp_dir):
+    def test_report_name_prefix(self, temp_dir, shared_reports):
         """Should prefix with report-name."""
-        reports_dir = temp_dir / "reports"
-        reports_dir.mkdir()
-        (reports_dir / "test.html").write_text("test")
+        reports_dir = shared_reports
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "integration-testing",
             "--reports-folder", str(reports_dir),
@@ -342,14 +409,12 @@ class TestTimestampedNaming:
 class TestGitHubOutput:
     """Test GITHUB_OUTPUT format."""
 
-    def test_report_dir_output(self, temp_dir):
+    def test_report_dir_output(self, temp_dir, shared_reports):
         """Should output report-dir with full path."""
-        reports_dir = temp_dir / "reports"
-        reports_dir.mkdir()
-        (reports_dir / "test.html").write_text("test")
+        reports_dir = shared_reports
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", str(reports_dir),
@@ -360,14 +425,12 @@ class TestGitHubOutput:
         assert "report-dir" in outputs
         assert outputs["report-dir"].startswith(str(output_dir))
 
-    def test_report_dirname_output(self, temp_dir):
+    def test_report_dirname_output(self, temp_dir, shared_reports):
         """Should output report-dirname without parent path."""
-        reports_dir = temp_dir / "reports"
-        reports_dir.mkdir()
-        (reports_dir / "test.html").write_text("test")
+        reports_dir = shared_reports
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", str(reports_dir),
@@ -379,14 +442,12 @@ class TestGitHubOutput:
         # dirname should not contain path separators
         assert "/" not in outputs["report-dirname"]
 
-    def test_report_dir_contains_dirname(self, temp_dir):
+    def test_report_dir_contains_dirname(self, temp_dir, shared_reports):
         """Should have report-dir end with report-dirname."""
-        reports_dir = temp_dir / "reports"
-        reports_dir.mkdir()
-        (reports_dir / "test.html").write_text("test")
+        reports_dir = shared_reports
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", str(reports_dir),
@@ -400,17 +461,15 @@ class TestGitHubOutput:
 class TestNewlineParsing:
     """Test newline-separated input parsing."""
 
-    def test_blank_lines_skipped(self, temp_dir):
+    def test_blank_lines_skipped(self, temp_dir, shared_reports):
         """Should skip blank lines in input."""
-        reports_dir = temp_dir / "reports"
-        reports_dir.mkdir()
-        (reports_dir / "test.html").write_text("test")
+        reports_dir = shared_reports
 
         # Include blank lines and extra whitespace
         folder_arg = f"\n  \n{reports_dir}\n  \n"
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", folder_arg,
@@ -418,16 +477,14 @@ class TestNewlineParsing:
         )
         assert result.returncode == 0
 
-    def test_whitespace_trimmed(self, temp_dir):
+    def test_whitespace_trimmed(self, temp_dir, shared_reports):
         """Should trim whitespace from each line."""
-        reports_dir = temp_dir / "reports"
-        reports_dir.mkdir()
-        (reports_dir / "test.html").write_text("test")
+        reports_dir = shared_reports
 
         folder_arg = f"  {reports_dir}  "
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", folder_arg,
@@ -446,7 +503,7 @@ class TestSecurity:
         (reports_dir / "test.html").write_text("test")
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test\ninjected=malicious",
             "--reports-folder", str(reports_dir),
@@ -466,7 +523,7 @@ class TestSecurity:
         (reports_dir / "test.html").write_text("test")
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test; rm -rf /",
             "--reports-folder", str(reports_dir),
@@ -487,7 +544,7 @@ class TestSecurity:
         folder_arg = f"../../../etc\n{reports_dir}"
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", folder_arg,
@@ -505,7 +562,7 @@ class TestSecurity:
         logs_arg = "../../../etc/passwd"
         output_dir = temp_dir / "out"
 
-        result = run_script(
+        result = call_main(
             SCRIPT_PATH,
             "--report-name", "test",
             "--reports-folder", str(reports_dir),
@@ -1,10 +1,5 @@
 """Tests for check-internal-pinning.py - release-time mutable reference guard."""
 
-import sys
-from pathlib import Path
-
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from conftest import PROJECT_ROOT, run_script
 
 SCRIPT_PATH = PROJECT_ROOT / "workflow-scripts/check-internal-pinning.py"
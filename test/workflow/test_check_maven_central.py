@@ -1,26 +1,19 @@
 """Tests for check-maven-central.py."""
 
-import importlib.util
 import os
-import sys
 import tempfile
 import urllib.error
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from conftest import PROJECT_ROOT, run_script
+from conftest import PROJECT_ROOT, load_script, run_script
 
 SCRIPT_PATH = PROJECT_ROOT / "workflow-scripts/check-maven-central.py"
 
 
 def _load_module():
     """Load check-maven-central.py as a module for unit testing."""
-    spec = importlib.util.spec_from_file_location("check_maven_central", SCRIPT_PATH)
-    mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
-    return mod
+    return load_script(SCRIPT_PATH)
 
 
 class TestCheckArtifactAvailable:
@@ -2,13 +2,10 @@
 
 import json
 import sys
-from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from conftest import PROJECT_ROOT
 
 # Add workflow-scripts to path so we can import the module directly
@@ -1,11 +1,7 @@
 """Tests for generate-overview-index.py - overview index generation script."""
 
 import re
-import sys
-from pathlib import Path
 
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from conftest import PROJECT_ROOT, run_script
 
 SCRIPT_PATH = PROJECT_ROOT / ".github/actions/assemble-test-reports/generate-overview-index.py"
@@ -114,6 +110,23 @@ class TestOverviewIndex:
         index_html = (temp_dir / "index.html").read_text()
         assert "some-file.txt" not in index_html
 
+    def test_ignores_symlinked_dirs(self, temp_dir):
+        """Should not follow symlinks to directories."""
+        real = temp_dir / "report-2025-01-15-1430-2300"
+        real.mkdir()
+        (temp_dir / "report-2025-01-16-1430-2300").symlink_to(real, target_is_directory=True)
+
+        result = run_script(
+            SCRIPT_PATH,
+            "--target-dir", str(temp_dir),
+            "--title", "test",
+        )
+        assert result.returncode == 0
+
+        index_html = (temp_dir / "index.html").read_text()
+        assert "report-2025-01-15-1430-2300" in index_html
+        assert "report-2025-01-16-1430-2300" not in index_html
+
     def test_handles_empty_target_dir(self, temp_dir):
         """Should generate index even when no reports exist."""
         result = run_script(
@@ -237,6 +250,19 @@ class TestTimestampDetection:
         assert "e-2-e-playwright" in index_html
 
 
+class TestPublishedFiles:
+    """Test what the script leaves in the published target directory."""
+
+    def test_only_index_html_is_written(self, temp_dir):
+        """Should add nothing but index.html next to the report directories."""
+        (temp_dir / "report-2025-01-15-1430-2300").mkdir()
+
+        result = run_script(SCRIPT_PATH, "--target-dir", str(temp_dir), "--title", "test")
+        assert result.returncode == 0
+
+        assert sorted(p.name for p in temp_dir.iterdir()) == ["index.html", "report-2025-01-15-1430-2300"]
+
+
 class TestHtmlOutput:
     """Test HTML output quality."""
 
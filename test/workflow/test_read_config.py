@@ -2,13 +2,9 @@
 
 import json
 import re
-import sys
-from pathlib import Path
 
 import pytest
 
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from conftest import PROJECT_ROOT, run_script
 
 SCRIPT_PATH = PROJECT_ROOT / ".github/actions/read-project-config/read-config.py"
@@ -703,3 +699,13 @@ class TestEdgeCases:
         result = run_script(SCRIPT_PATH, "--config", str(config))
         assert result.returncode == 0
         assert "java-version=17" in result.stdout
+
+    def test_non_mapping_section_uses_defaults(self, temp_dir):
+        """Should fall back to defaults when a section is not a mapping."""
+        config = temp_dir / "project.yml"
+        config.write_text("maven-build: 17\nsonar:\n  - enabled\nconsumers: repo-a")
+        result = run_script(SCRIPT_PATH, "--config", str(config))
+        assert result.returncode == 0
+        assert "java-version=21" in result.stdout
+        assert "sonar-enabled=true" in result.stdout
+        assert "consumers=\n" in result.stdout
@@ -6,12 +6,10 @@ job is to read history correctly, and the failure mode it exists to prevent
 """
 
 import subprocess
-import sys
 from pathlib import Path
 
 import pytest
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from conftest import PROJECT_ROOT, run_script
 
 SCRIPT_PATH = PROJECT_ROOT / ".github/actions/release-guard/release-guard.py"
@@ -2,10 +2,7 @@
 
 import importlib.util
 import sys
-from pathlib import Path
 
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from conftest import PROJECT_ROOT, run_script
 
 # Add workflow-scripts to path
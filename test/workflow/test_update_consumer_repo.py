@@ -1,11 +1,7 @@
 """Tests for update-consumer-repo.py argument validation and auto-merge config."""
 
 import importlib.util
-import sys
-from pathlib import Path
 
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from conftest import PROJECT_ROOT, run_script
 
 SCRIPT_PATH = PROJECT_ROOT / "workflow-scripts/update-consumer-repo.py"
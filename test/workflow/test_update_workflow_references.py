@@ -1,10 +1,5 @@
 """Tests for update-workflow-references.py - SHA reference updater."""
 
-import sys
-from pathlib import Path
-
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from conftest import PROJECT_ROOT, run_script
 
 SCRIPT_PATH = PROJECT_ROOT / "workflow-scripts/update-workflow-references.py"
@@ -790,6 +785,29 @@ uses: cuioss/cuioss-organization/.github/workflows/reusable-npm-build.yml@main
         assert doc_content.count(f"@{VALID_SHA}") == 2
         assert "@main" not in doc_content
 
+    def test_updates_bare_old_sha_without_org_reference(self, temp_dir):
+        """The substring prefilter must still let through files that only mention the old SHA."""
+        examples_dir = temp_dir / "docs" / "workflow-examples"
+        examples_dir.mkdir(parents=True)
+        (examples_dir / "example.yml").write_text(f"""
+    uses: cuioss/cuioss-organization/.github/workflows/reusable-maven-build.yml@{self.OLD_SHA} # v0.2.9
+""")
+        pinned = temp_dir / "pinned.txt"
+        pinned.write_text(f"release commit: {self.OLD_SHA} # v0.2.9\n")
+        untouched = temp_dir / "other.txt"
+        untouched.write_text("nothing to see here\n")
+
+        result = run_script(
+            SCRIPT_PATH,
+            "--version", VALID_VERSION,
+            "--sha", VALID_SHA,
+            "--path", str(temp_dir)
+        )
+
+        assert result.returncode == 0
+        assert pinned.read_text() == f"release commit: {VALID_SHA} # v{VALID_VERSION}\n"
+        assert untouched.read_text() == "nothing to see here\n"
+
     def test_skips_release_yml_with_templates_in_normal_sha_mode(self, temp_dir):
         """Template skip guard must work in normal SHA mode, not just regex fallback."""
         examples_dir = temp_dir / "docs" / "workflow-examples"
@@ -2,12 +2,8 @@
 
 import importlib.util
 import json
-import sys
-from pathlib import Path
 from unittest.mock import patch
 
-# Add parent to path to access conftest
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from conftest import PROJECT_ROOT, run_script
 
 SCRIPT_PATH = PROJECT_ROOT / "workflow-scripts/verify-consumer-prs.py"
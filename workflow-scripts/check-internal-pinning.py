@@ -19,6 +19,7 @@ Exit codes:
 """
 
 import argparse
+import os
 import re
 import sys
 from pathlib import Path
@@ -46,7 +47,15 @@ def find_mutable_references(base_path: Path) -> list[tuple[Path, int, str, str]]
     if not workflows_dir.exists():
         return violations
 
-    for yml_file in sorted(workflows_dir.glob('*.yml')):
+    # GitHub only loads workflows from this one flat directory, so a single
+    # scandir pass is enough and the entry type comes from the listing itself.
+    with os.scandir(workflows_dir) as entries:
+        yml_files = sorted(
+            Path(entry.path) for entry in entries
+            if entry.name.endswith('.yml') and entry.is_file()
+        )
+
+    for yml_file in yml_files:
         for lineno, line in enumerate(yml_file.read_text().splitlines(), start=1):
             # Commented-out lines are usage examples for consumers, not
             # references this workflow executes.
@@ -70,9 +70,12 @@ def read_auto_merge_config(repo_dir: Path) -> dict:
         print("::warning::PyYAML not available, using auto-merge defaults")
         return config
 
+    # Prefer the libyaml-backed loader; fall back to the pure-Python one
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
     try:
         with open(project_yml, encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=loader)
 
         if not isinstance(data, dict):
             return config
@@ -29,6 +29,12 @@ except ImportError:  # pragma: no cover - pre-installed on GitHub runners
     print("Error: PyYAML not installed. Run: pip install pyyaml", file=sys.stderr)
     sys.exit(1)
 
+# Prefer the libyaml-backed loader; fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - libyaml is bundled with runner PyYAML
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
 DEFAULT_LABEL = "automerge"
 DEFAULT_OWNER = "cuioss"
 DEFAULT_AUTHOR = "app/dependabot"
@@ -203,7 +209,7 @@ def repo_participates(repo: str, cache: dict[str, str]) -> str:
 
     try:
         raw = base64.b64decode(result.stdout.strip()).decode("utf-8")
-        config = yaml.safe_load(raw)
+        config = yaml.load(raw, Loader=_YamlLoader)
     except (ValueError, UnicodeDecodeError, yaml.YAMLError):
         cache[repo] = "indeterminate"
         return "indeterminate"
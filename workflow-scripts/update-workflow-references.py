@@ -21,16 +21,33 @@ import argparse
 import re
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Files are rewritten by this many threads; the work is small-file I/O
+REWRITE_WORKERS = 16
+
 # Directories that should never be scanned
 SKIP_DIRS = {'.git', '.pyprojectx', '__pycache__', 'node_modules', '.venv', 'venvs'}
 
+# Substring every cuioss-organization reference contains
+ORG_REPO_MARKER = 'cuioss/cuioss-organization/'
+
 # Pattern to find an existing cuioss-organization SHA reference
 SHA_DISCOVERY_PATTERN = re.compile(
     r'cuioss/cuioss-organization/[^@]+@([a-f0-9]{40})'
 )
 
+# Pattern to find a cuioss-organization reference whose ref is a template
+# expression (e.g. release.yml: uses: ...@${{ steps.sha.outputs.sha }})
+TEMPLATE_REF_PATTERN = re.compile(
+    r'cuioss/cuioss-organization/[^@]+@\$\{\{'
+)
+
+# Command line validation
+VERSION_PATTERN = re.compile(r'\d+\.\d+\.\d+')
+SHA_PATTERN = re.compile(r'[a-f0-9]{40}')
+
 # Pattern to match any cuioss-organization reference
 CUIOSS_REF_PATTERN = re.compile(
     r'(uses:\s*cuioss/cuioss-organization/[^@]+)@[^\s#]+(\s*#\s*v[\d.]+)?'
@@ -155,19 +172,30 @@ def update_workflow_references(
 
     new_ref = f'{sha} # v{version}'
     comment_suffix = f' # v{version}'
-    modified_files = []
     reusable_workflows = set(iter_reusable_workflows(base_path))
+    old_sha_pattern = re.compile(rf'{old_sha}(\s*#\s*v[\d.]+)?') if old_sha else None
+    marker_bytes = ORG_REPO_MARKER.encode()
+    old_sha_bytes = old_sha.encode() if old_sha else None
 
-    for path in _iter_text_files(base_path):
+    def rewrite(path: Path) -> bool:
+        """Rewrite one file's references; True if it was modified."""
         try:
-            content = path.read_text()
-        except (UnicodeDecodeError, PermissionError):
-            continue
+            raw = path.read_bytes()
+        except PermissionError:
+            return False
+
+        # Most files reference neither the org repo nor the old SHA; a bytes
+        # substring test rules them out before any decoding or regex work
+        if marker_bytes not in raw and not (old_sha_bytes and old_sha_bytes in raw):
+            return False
+        try:
+            content = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            return False
 
         # Skip files where cuioss-organization refs use template expressions as the ref
-        # (e.g. release.yml: uses: ...@${{ steps.sha.outputs.sha }})
-        if re.search(r'cuioss/cuioss-organization/[^@]+@\$\{\{', content):
-            continue
+        if TEMPLATE_REF_PATTERN.search(content):
+            return False
 
         # Internal action refs inside reusable workflows are owned by
         # internal-only mode and are pinned to a different (earlier) commit —
@@ -175,32 +203,46 @@ def update_workflow_references(
         skip_internal = path in reusable_workflows
 
         updated_lines = []
-        for line in content.splitlines(keepends=True):
-            if skip_internal and is_internal_action_line(line):
-                updated_lines.append(line)
+        changed = False
+        for original in content.splitlines(keepends=True):
+            if skip_internal and is_internal_action_line(original):
+                updated_lines.append(original)
                 continue
 
+            line, hits = original, 0
+
             # Pass 1: SHA → SHA replacement (only when old SHA is known)
-            if old_sha and old_sha in line:
-                line = re.sub(
-                    rf'{old_sha}(\s*#\s*v[\d.]+)?',
-                    new_ref,
-                    line
-                )
+            if old_sha and old_sha_pattern and old_sha in line:
+                line, count = old_sha_pattern.subn(new_ref, line)
+                hits += count
 
             # Pass 2: catch remaining non-SHA refs (@v0.2.9, @main, etc.)
-            line = CUIOSS_REF_PATTERN.sub(
+            line, count = CUIOSS_REF_PATTERN.subn(
                 rf'\1@{sha}{comment_suffix}',
                 line
             )
+            hits += count
+
+            # A match may re-render identical text (ref already pinned), so
+            # only lines that were both matched and altered count as changes
+            if hits and line != original:
+                changed = True
             updated_lines.append(line)
 
-        new_content = ''.join(updated_lines)
+        if not changed:
+            return False
+        path.write_bytes(''.join(updated_lines).encode('utf-8'))
+        return True
 
-        if new_content != content:
-            path.write_text(new_content)
-            modified_files.append(str(path))
-            print(f"Updated: {path}")
+    # Files are independent, so read/rewrite them concurrently; results are
+    # reported in file order.
+    paths = list(_iter_text_files(base_path))
+    modified_files = []
+    with ThreadPoolExecutor(max_workers=REWRITE_WORKERS) as pool:
+        for path, modified in zip(paths, pool.map(rewrite, paths), strict=True):
+            if modified:
+                modified_files.append(str(path))
+                print(f"Updated: {path}")
 
     return modified_files
 
@@ -221,6 +263,8 @@ def _update_internal_only(version: str, sha: str, base_path: Path) -> list[str]:
 
     for yml_file in iter_reusable_workflows(base_path):
         content = yml_file.read_text()
+        if ORG_REPO_MARKER not in content:
+            continue
 
         updated_lines = [
             INTERNAL_ACTION_REF_PATTERN.sub(new_ref, line)
@@ -265,11 +309,11 @@ def main():
 
     args = parser.parse_args()
 
-    if not re.match(r'^\d+\.\d+\.\d+$', args.version):
+    if not VERSION_PATTERN.fullmatch(args.version):
         print(f"Error: Version must be semver (e.g. 1.2.3), got: {args.version}", file=sys.stderr)
         sys.exit(1)
 
-    if len(args.sha) != 40 or not re.match(r'^[a-f0-9]+$', args.sha):
+    if not SHA_PATTERN.fullmatch(args.sha):
         print(f"Error: SHA must be a 40-character hex string, got: {args.sha}", file=sys.stderr)
         sys.exit(1)
 